@@ -18,6 +18,7 @@ class GoBase(ABC):
     """
     Abstract base class for the game of Go
     """
+    __slots__ = ("_side", "_players", "_superko")
 
     _side: int
     _players: int
@@ -0,0 +1,95 @@
+"""
+Memory benchmark for the Go engine: bytes per position and per game
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from go import Go
+
+
+def add_line_parameters() -> argparse.Namespace:
+    """
+    Adds command-line parameters to the benchmark
+    """
+    parser = argparse.ArgumentParser(description='Go memory benchmark')
+
+    parser.add_argument('-s', '--sizes', type=int, nargs='+',
+                        default=[9, 13, 19])
+    parser.add_argument('-p', '--positions', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--history-limit', type=int, default=None)
+
+    return parser.parse_args()
+
+def random_game(side: int, plies: int, rng: random.Random,
+                history_limit: int | None = None) -> Go:
+    """
+    Plays random legal moves (passing when there are none) until the game
+    is over or plies moves have been played
+
+    Returns (Go): the game
+    """
+    game = Go(side=side, players=2, history_limit=history_limit)
+    for _ in range(plies):
+        if game.done:
+            break
+        moves = game.moves(legal_only=True)
+        game.play(rng.choice(moves) if moves else None)
+    return game
+
+def traced_bytes(build) -> tuple[object, int]:
+    """
+    Calls build and measures the memory still allocated by it afterwards
+
+    Returns (tuple): what build returned and the number of bytes it holds
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+def position_bytes(side: int, count: int, rng: random.Random) -> float:
+    """
+    Measures the memory of a position, as held by a search node: a game
+    created by simulate_move from a half-played game
+
+    Returns (float): average bytes per position
+    """
+    game = random_game(side, side * side // 2, rng)
+    moves = [rng.choice(game.moves(legal_only=True)) for _ in range(count)]
+    _, size = traced_bytes(
+        lambda: [game.simulate_move(move) for move in moves])
+    return size / count
+
+def game_bytes(side: int, rng: random.Random,
+               history_limit: int | None = None) -> tuple[float, int]:
+    """
+    Measures the memory of a whole random game, including its history
+
+    Returns (tuple): bytes for the game and the number of moves played
+    """
+    game, size = traced_bytes(
+        lambda: random_game(side, 2 * side * side, rng, history_limit))
+    return size, game._history.depth  # pylint: disable=protected-access
+
+def main():
+    args = add_line_parameters()
+    rng = random.Random(args.seed)
+
+    print(f"{'size':>6} {'bytes/position':>15} {'bytes/game':>12} "
+          f"{'moves':>6} {'bytes/move':>11}")
+    for side in args.sizes:
+        per_position = position_bytes(side, args.positions, rng)
+        per_game, plies = game_bytes(side, rng, args.history_limit)
+        print(f"{side:>6} {per_position:>15.0f} {per_game:>12.0f} "
+              f"{plies:>6} {per_game / max(plies, 1):>11.1f}")
+
+if __name__ == '__main__':
+    main()
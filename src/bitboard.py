@@ -0,0 +1,178 @@
+"""
+For BitboardGo(SnapshotGo), a Go engine storing the board as bitmasks
+"""
+from base import BoardGridType, ListMovesType
+from snapshot import SnapshotGo
+
+
+class BitboardGo(SnapshotGo):
+    """
+    Go engine that stores the stones of each player as one arbitrary-precision
+    integer, with one bit per intersection.
+
+    Square (row, col), numbered from 1, is bit (row - 1) * width + (col - 1),
+    where width is the board size plus one. The extra column of every row is
+    never set, so shifting a bitmask by one to the left or right can never
+    move a stone onto the next or previous row. Flood fills, liberties,
+    captures and territory are all computed with shifts and masks.
+    """
+    __slots__ = ("_width", "_mask", "_stones")
+
+    _width: int #bits per row, including the guard column
+    _mask: int #bitmask of every square on the board
+    _stones: list[int] #bitmask of each player's stones, indexed by player
+
+    def __init__(self, side: int, players: int, superko: bool = False):
+        super().__init__(side, players, superko)
+        self._width = side + 1
+        row = (1 << side) - 1
+        self._mask = 0
+        for r in range(side):
+            self._mask |= row << (r * self._width)
+        self._stones = [0] * (players + 1)
+        self._start()
+
+    @property
+    def grid(self) -> BoardGridType:
+        grid: BoardGridType = [[None] * self._side for _ in range(self._side)]
+        for player in range(1, self._players + 1):
+            for row, col in self._positions(self._stones[player]):
+                grid[row - 1][col - 1] = player
+        return grid
+
+    @property
+    def available_moves(self) -> ListMovesType:
+        if self._game_over:
+            return []
+        return self._positions(self._empty())
+
+    def piece_at(self, pos: tuple[int, int]) -> int | None:
+        bit = self._bit(pos)
+        for player in range(1, self._players + 1):
+            if self._stones[player] & bit:
+                return player
+        return None
+
+    def scores(self) -> dict[int, int]:
+        scores = {player: self._stones[player].bit_count()
+                  for player in range(1, self._players + 1)}
+
+        occupied = self._mask & ~self._empty()
+        remaining = self._empty()
+        while remaining:
+            region = self._flood(remaining & -remaining, remaining)
+            remaining &= ~region
+            border = self._dilate(region) & occupied
+            owners = [player for player in range(1, self._players + 1)
+                      if border & self._stones[player]]
+            if len(owners) == 1:
+                scores[owners[0]] += region.bit_count()
+        return scores
+
+    def _snapshot(self) -> tuple[int, ...]:
+        return tuple(self._stones)
+
+    def _placed(self, pos: tuple[int, int]) -> tuple[int, ...]:
+        return self._result(self._bit(pos), self._turn)
+
+    def _play(self, pos: tuple[int, int]) -> None:
+        self._stones = list(self._result(self._bit(pos), self._turn))
+        self._record()
+
+    def _load(self, grid: BoardGridType) -> None:
+        stones = [0] * (self._players + 1)
+        for row in range(self._side):
+            for col in range(self._side):
+                player = grid[row][col]
+                if player is not None:
+                    stones[player] |= 1 << (row * self._width + col)
+        self._stones = stones
+
+    def _copy(self) -> "BitboardGo":
+        game = super()._copy()
+        game._stones = self._stones[:]
+        return game
+
+    def _bit(self, pos: tuple[int, int]) -> int:
+        """
+        Returns the bitmask of a single position
+
+        Raises: ValueError if the position is not on the board
+        """
+        row, col = pos
+        if not (1 <= row <= self._side and 1 <= col <= self._side):
+            raise ValueError(f"Position {pos} is out of bounds")
+        return 1 << ((row - 1) * self._width + (col - 1))
+
+    def _positions(self, bits: int) -> ListMovesType:
+        """
+        Returns the (row, col) positions of the set bits of a bitmask, in
+        row-major order
+        """
+        positions = []
+        while bits:
+            low = bits & -bits
+            row, col = divmod(low.bit_length() - 1, self._width)
+            positions.append((row + 1, col + 1))
+            bits ^= low
+        return positions
+
+    def _empty(self) -> int:
+        """
+        Returns the bitmask of the empty squares
+        """
+        occupied = 0
+        for stones in self._stones:
+            occupied |= stones
+        return self._mask & ~occupied
+
+    def _dilate(self, bits: int) -> int:
+        """
+        Returns the bitmask of every square adjacent to a set bit of bits
+        """
+        return ((bits << 1) | (bits >> 1) | (bits << self._width) |
+                (bits >> self._width)) & self._mask
+
+    def _flood(self, seed: int, region: int) -> int:
+        """
+        Returns the squares of region connected to seed
+        """
+        group = seed
+        while True:
+            grown = (group | self._dilate(group)) & region
+            if grown == group:
+                return group
+            group = grown
+
+    def _result(self, bit: int, player: int) -> tuple[int, ...]:
+        """
+        Computes the stones of every player after player places a stone on
+        a square, without changing the game. A stone already on the square
+        is replaced.
+
+        Opponent groups left without liberties are captured first; if the
+        new stone's group still has no liberties afterwards, it is removed
+        too.
+        """
+        stones = [other & ~bit for other in self._stones]
+        stones[player] |= bit
+        empty = self._empty() & ~bit
+        around = self._dilate(bit)
+
+        captured = 0
+        for opponent in range(1, self._players + 1):
+            if opponent == player:
+                continue
+            touching = around & stones[opponent]
+            while touching:
+                group = self._flood(touching & -touching, stones[opponent])
+                touching &= ~group
+                if not self._dilate(group) & empty:
+                    captured |= group
+                    stones[opponent] &= ~group
+        empty |= captured
+
+        own = self._flood(bit, stones[player])
+        if not self._dilate(own) & empty:
+            stones[player] &= ~own
+        return tuple(stones)
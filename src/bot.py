@@ -4,7 +4,20 @@ This represents the bot
 
 import random
 import argparse
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
 from go import Go
+from mcts import mcts_move
+from minimax import minimax_move
+from playout import random_playout
+from transposition import TranspositionTable
+
+try:
+    from numpy_go import GoBatch
+except ImportError:  # NumPy is not installed, so games are played one by one
+    GoBatch = None
+
+# Moves (including passes) after which a simulated game is stopped
+MAX_MOVES = 256
 
 
 def add_line_parameters() -> argparse.Namespace:
@@ -19,52 +32,84 @@ def add_line_parameters() -> argparse.Namespace:
     parser.add_argument('-n', '--num-games', type=int, default=20)
     parser.add_argument('-s', '--size', type=int, default=6)
     parser.add_argument('-1', '--player1', type=str, default='random',
-    choices=['random', 'smart', 'heuristic'])
+    choices=['random', 'smart', 'heuristic', 'mcts', 'minimax'])
     parser.add_argument('-2', '--player2', type=str, default='random',
-    choices=['random', 'smart', 'heuristic'])
+    choices=['random', 'smart', 'heuristic', 'mcts', 'minimax'])
+    parser.add_argument('-p', '--playouts', type=int, default=None,
+    help='playouts per move for the mcts strategy')
+    parser.add_argument('-t', '--time-ms', type=float, default=None,
+    help='milliseconds per move for the mcts and minimax strategies')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+    help='worker processes playing games in parallel')
+    parser.add_argument('--search-jobs', type=int, default=1,
+    help='worker processes searching in parallel for the mcts strategy '
+    '(the statistics of seeded games depend on this, but not on --jobs)')
+    parser.add_argument('--seed', type=int, default=None,
+    help='master seed of the games, for repeatable statistics (moves '
+    'chosen within a time budget still depend on the machine)')
+    parser.add_argument('--table-mb', type=float, default=16,
+    help='memory cap of each player\'s transposition table (0 for none)')
 
     args = parser.parse_args()
 
     return args
 
-def heuristic(game: Go) -> tuple[int, int]:
+def heuristic(game: Go, table: TranspositionTable | None = None,
+              rng: random.Random | None = None) -> tuple[int, int]:
     """
     Employs a strategy based on trying to control the corners or edges.
-    Resorts to smart strategy if edges and corners are full. 
+    Resorts to smart strategy (with the transposition table, if given) if
+    edges and corners are full. Random choices are made with rng, or the
+    random module's functions by default.
 
     Returns (tuple): the location of the move
     """
-    size = game.size
-    poss_edges = []
-    poss_corners = []
-    board_corners = [(0, 0), (0, size-1), (size-1, 0), (size-1, size-1)]
-    board_edges = [(0, i) for i in range(1, size-1)] + \
-            [(i, 0) for i in range(1, size-1)] + \
-            [(size-1, i) for i in range(1, size-1)] + \
-            [(i, size-1) for i in range(1, size-1)]
-
-    for corner in board_corners:
-        if corner in game.available_moves:
-            poss_corners.append(corner)
-
-    for edge in board_edges:
-        if edge in game.available_moves:
-            poss_edges.append(edge)
-
+    choice = random.choice if rng is None else rng.choice
+    geo = game.geometry
+    available = set(game.available_moves)
+    poss_corners = [geo.positions[corner] for corner in geo.corners
+                    if geo.positions[corner] in available]
     if poss_corners:
-        return random.choice(poss_corners)
+        return choice(poss_corners)
 
-    if poss_edges:
-        poss_edges.sort(key=lambda x: min(abs(x[0]), abs(x[1]-size+1),
-        abs(x[0]-size+1), abs(x[1])))
-        return poss_edges[0]
+    for edge in geo.edges:
+        if geo.positions[edge] in available:
+            return geo.positions[edge]
 
-    return smart_strategy(game)
+    return smart_strategy(game, table, rng)
 
-def smart_strategy(game: Go) -> tuple[int,int]:
+def leaf_scores(game: Go, move: tuple[int, int],
+                table: TranspositionTable | None) -> dict[int, int]:
+    """
+    Returns the scores after a move, looking them up in the transposition
+    table (if given) before simulating the move. The key of the position
+    comes from the legality check, so a position found in the table is
+    never played out.
+    """
+    if table is None:
+        return game.simulate_move(move).scores()
+    result = game.check_move(move)
+    if result is None:
+        # not a legal move, so not a position worth remembering
+        return game.simulate_move(move).scores()
+    # no passes have been played since the move
+    key = (result.hash, game.turn % game.num_players + 1, 0)
+    entry = table.lookup(key)
+    if entry is not None:
+        return entry.value
+    scores = game.simulate_move(move).scores()
+    table.store(key, scores)
+    return scores
+
+def smart_strategy(game: Go, table: TranspositionTable | None = None,
+                   rng: random.Random | None = None) -> tuple[int,int]:
     """
     Identifies the best move for the more intelligent player by analyzing the 
-    propsective implications of a selected move
+    propsective implications of a selected move. The scores of the
+    positions two moves ahead are kept in the transposition table, if
+    given, so that positions reached by different move orders (or again
+    on later moves) are only scored once. If no move stands out, one is
+    chosen at random with rng (the random module's functions by default).
 
     Returns (tuple): the location of the move
     """
@@ -78,8 +123,7 @@ def smart_strategy(game: Go) -> tuple[int,int]:
         piece_counts = []
 
         for next_move in next_moves:
-            simulate_game_two = simulate_game.simulate_move(next_move)
-            scores = simulate_game_two.scores()
+            scores = leaf_scores(simulate_game, next_move, table)
             piece_counts.append(scores.get(current_player, 0))
 
         value_m = sum(piece_counts) / len(piece_counts) if piece_counts else 0
@@ -88,34 +132,83 @@ def smart_strategy(game: Go) -> tuple[int,int]:
             top_val = value_m
             best_move = move
 
-    return best_move if best_move else random.choice(game.available_moves)
+    choice = random.choice if rng is None else rng.choice
+    return best_move if best_move else choice(game.available_moves)
 
-def simulated_game(side:int, p1_strat: str, p2_strat: str) -> tuple[Go, int]:
+def mcts_strategy(game: Go, playouts: int | None, time_ms: float | None,
+                  jobs: int = 1, pool: Executor | None = None,
+                  rng: random.Random | None = None) -> tuple[int, int]:
     """
-    Simulates a game using a 6x6 board and 2 players.
+    Chooses a move with Monte Carlo Tree Search, within a playout count or
+    a time budget, searching jobs trees in parallel on pool, with random
+    numbers from rng if given (see mcts.mcts_move)
+
+    Returns (tuple): the location of the move, (0, 0) to pass
+    """
+    move = mcts_move(game, playouts, time_ms, rng, jobs, pool)
+    return (0, 0) if move is None else move
+
+def minimax_strategy(game: Go, time_ms: float | None,
+                     table: TranspositionTable | None = None
+                     ) -> tuple[int, int]:
+    """
+    Chooses a move with alpha-beta search, deepening it until the time
+    budget runs out (or to minimax.DEFAULT_DEPTH without one), keeping
+    what it learns in the transposition table, if given (see
+    minimax.minimax_move)
+
+    Returns (tuple): the location of the move, (0, 0) to pass
+    """
+    move = minimax_move(game, time_ms, table=table)
+    return (0, 0) if move is None else move
+
+def simulated_game(side:int, p1_strat: str, p2_strat: str,
+                   playouts: int | None = None, time_ms: float | None = None,
+                   jobs: int = 1, pool: Executor | None = None,
+                   tables: dict[int, TranspositionTable] | None = None,
+                   rng: random.Random | None = None) -> tuple[Go, int]:
+    """
+    Simulates a game using a 6x6 board and 2 players. playouts and
+    time_ms set the budget of the mcts strategy, which searches jobs
+    trees in parallel on pool; time_ms is also the budget of the minimax
+    strategy. tables holds the transposition table of each player, if
+    any. Every random choice is made with rng, or the random module's
+    functions by default. Random-vs-random games are played by the light
+    playout engine (see playout.random_playout), so the game returned has
+    the final board but no history.
 
     Returns (tuple): simulated game and the move count
     """
+    if p1_strat == p2_strat == 'random':
+        return random_playout(side, MAX_MOVES, rng=rng)
+
+    choice = random.choice if rng is None else rng.choice
+
     game = Go(side=side, players=2)
     move_count = 0
-    max_count = 256
 
-    while not game.done and move_count < max_count:
+    while not game.done and move_count < MAX_MOVES:
         if game.turn == 1:
             current_strat = p1_strat
         else:
             current_strat = p2_strat
+        table = None if tables is None else tables.get(game.turn)
         if current_strat == 'random':
             poss_moves = [move for move in game.available_moves if move !=
                           (0, 0)]
             if poss_moves:
-                selected_move = random.choice(poss_moves)
+                selected_move = choice(poss_moves)
             else:
                 selected_move = (0, 0)
         elif current_strat == 'smart':
-            selected_move = smart_strategy(game)
+            selected_move = smart_strategy(game, table, rng)
+        elif current_strat == 'mcts':
+            selected_move = mcts_strategy(game, playouts, time_ms, jobs, pool,
+                                          rng)
+        elif current_strat == 'minimax':
+            selected_move = minimax_strategy(game, time_ms, table)
         else:
-            selected_move = heuristic(game)
+            selected_move = heuristic(game, table, rng)
         if selected_move == (0, 0):
             game.pass_turn()
         else:
@@ -124,35 +217,122 @@ def simulated_game(side:int, p1_strat: str, p2_strat: str) -> tuple[Go, int]:
 
     return game, move_count
 
-def statistics_games(total_games: int, side: int, p1_strat: str, p2_strat: str) -> None:
+def random_batch_games(total_games: int, side: int, seed: int | None = None
+                       ) -> list[tuple[dict[int, int], int]]:
+    """
+    Plays random-vs-random games all at once with GoBatch, following the
+    same rules as simulated_game: each move is a random empty position
+    (a pass when there is none), and a game stops when it is over or
+    after MAX_MOVES moves. The moves are drawn from seed, if given.
+
+    Returns (list): the scores and the move count of every game
+    """
+    batch = GoBatch(total_games, side, players=2, seed=seed)
+    move_counts = 0
+
+    for _ in range(MAX_MOVES):
+        active = ~batch.done
+        if not active.any():
+            break
+        move_counts = move_counts + active
+        batch.step(batch.random_moves())
+
+    return [({1: int(scores[0]), 2: int(scores[1])}, int(move_count))
+            for scores, move_count in zip(batch.scores(), move_counts)]
+
+def statistics_game(side: int, p1_strat: str, p2_strat: str,
+                    playouts: int | None, time_ms: float | None,
+                    table_mb: float, seed: int, search_jobs: int = 1
+                    ) -> tuple[dict[int, int], int, dict[int, tuple]]:
+    """
+    Plays one game of statistics_games (in a worker process when several
+    jobs are used). The game draws all its random numbers from its own
+    seed, and each player searching with the smart, heuristic or minimax
+    strategy gets a new transposition table of table_mb megabytes, so the
+    game does not depend on the games played before it in the process.
+    The mcts strategy searches search_jobs trees in parallel, on a pool
+    of worker processes kept for the game.
+
+    Returns (tuple): the scores, the move count, and the hits, misses and
+        evictions of each player's transposition table
+    """
+    tables = {player: TranspositionTable(int(table_mb * 2 ** 20))
+              for player, strat in [(1, p1_strat), (2, p2_strat)]
+              if table_mb > 0 and strat in ('smart', 'heuristic', 'minimax')}
+    pool = ProcessPoolExecutor(search_jobs) if search_jobs > 1 and \
+        'mcts' in (p1_strat, p2_strat) else None
+    try:
+        game, move_count = simulated_game(side, p1_strat, p2_strat,
+                                          playouts, time_ms, search_jobs,
+                                          pool, tables, random.Random(seed))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return game.scores(), move_count, {
+        player: (table.hits, table.misses, table.evictions)
+        for player, table in tables.items()}
+
+def statistics_games(total_games: int, side: int, p1_strat: str, p2_strat: str,
+                     playouts: int | None = None, time_ms: float | None = None,
+                     jobs: int = 1, table_mb: float = 0,
+                     seed: int | None = None, search_jobs: int = 1) -> None:
     """
     Calculates percentage of wins for each player, ties, and the move count.
 
+    Each game is played by statistics_game with its own seed, drawn from
+    seed (a random one if not given), and with several jobs the games are
+    shared out to a pool of worker processes. The results are added up
+    as the games finish, so the statistics are the same whatever the
+    number of jobs (unless the moves are chosen within a time budget).
+    search_jobs is the number of trees the mcts strategy searches in
+    parallel for each move; the seeds given to the trees come from the
+    game's seed, so the statistics are repeatable for a given search_jobs,
+    but differ from one search_jobs to another.
+    With table_mb, the statistics of the players' transposition tables
+    are printed at the end.
+
     Returns: Nothing
     """
 
     win_dict: dict = {1: 0, 2: 0}
+    table_stats: dict[int, list[int]] = {}
     tie_count = 0
     avg_count = []
-
-    for _ in range(total_games):
-        game, move_count = simulated_game(side, p1_strat, p2_strat)
-        game_outcome = game.outcome
-        avg_count.append(move_count)
-        if len(game_outcome) == 1:
-            winner = game_outcome[0]
-            if winner in win_dict:
-                win_dict[winner] += 1
-            else:
-                win_dict[winner] = 1
+    master = random.Random(seed)
+    pool = None
+
+    if GoBatch is not None and p1_strat == p2_strat == 'random':
+        results = [(scores, move_count, {}) for scores, move_count in
+                   random_batch_games(total_games, side,
+                                      master.getrandbits(64))]
+    else:
+        arguments = (side, p1_strat, p2_strat, playouts, time_ms, table_mb)
+        seeds = [master.getrandbits(64) for _ in range(total_games)]
+        if jobs > 1:
+            pool = ProcessPoolExecutor(jobs)
+            futures = [pool.submit(statistics_game, *arguments, game_seed,
+                                   search_jobs) for game_seed in seeds]
+            results = (future.result() for future in as_completed(futures))
         else:
-            scores = game.scores()
+            results = (statistics_game(*arguments, game_seed, search_jobs)
+                       for game_seed in seeds)
+
+    try:
+        for scores, move_count, tables in results:
+            avg_count.append(move_count)
             if scores[1] > scores[2]:
                 win_dict[1] += 1
             elif scores[2] > scores[1]:
                 win_dict[2] += 1
             else:
                 tie_count += 1
+            for player, counts in tables.items():
+                totals = table_stats.setdefault(player, [0, 0, 0])
+                for position, count in enumerate(counts):
+                    totals[position] += count
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
 
     one_win_percent = f"{win_dict[1] / total_games * 100:.2f}"
     two_wins_percent = f"{win_dict[2] / total_games * 100:.2f}"
@@ -164,10 +344,17 @@ def statistics_games(total_games: int, side: int, p1_strat: str, p2_strat: str)
     print(f"Player 2 wins: {two_wins_percent}%")
     print(f"Ties: {ties_percent}%")
     print(f"Average moves: {average_moves}")
+    for player, (hits, misses, evictions) in sorted(table_stats.items()):
+        lookups = hits + misses
+        hit_rate = hits / lookups * 100 if lookups else 0.0
+        print(f"Player {player} tables: {hits} hits, {misses} misses "
+              f"({hit_rate:.1f}% hit rate), {evictions} evictions")
 
 def main():
     args = add_line_parameters()
-    statistics_games(args.num_games, args.size, args.player1, args.player2)
+    statistics_games(args.num_games, args.size, args.player1, args.player2,
+                     args.playouts, args.time_ms, args.jobs, args.table_mb,
+                     args.seed, args.search_jobs)
 
 if __name__ == '__main__':
     main()
@@ -156,7 +156,7 @@ class GoFake(GoBase):
     """
 
     _current_board: BoardGridType
-    _past_states: List[BoardGridType] = []
+    _past_states: List[BoardGridType]
 
     def __init__(self, side: int, players: int, superko: bool = False):
         super().__init__(side, players, superko)
@@ -0,0 +1,158 @@
+"""
+Precomputed geometry tables for Go boards, built once per board size
+"""
+from functools import lru_cache
+
+# Cell values of the empty flat board (same as go.EMPTY and go.BORDER)
+EMPTY = 0
+BORDER = 0xFF
+
+
+class Geometry:
+    """
+    Tables describing a square board of a given size, for the flat layout
+    used by go.Board: square (row, col), numbered from 1, lives at index
+    row * stride + col, with a one-cell border all around the board.
+
+    Every table is indexed by flat index and holds shared, immutable values,
+    so looking up a neighbour or a position never allocates anything. Use
+    geometry(size) rather than the constructor, so that each size is only
+    built once.
+
+    The eight symmetries of the board are numbered as follows: 0 is the
+    identity, 1, 2 and 3 rotate the board by a quarter, half and three
+    quarters of a turn, and 4 to 7 are the same rotations applied after
+    mirroring the board left to right.
+    """
+    size: int #length of a square board
+    stride: int #length of a row, including the two border cells
+    cells: bytes #the empty flat board, EMPTY on the board and BORDER around it
+    offsets: tuple[int, int, int, int] #index offsets of the four neighbours
+    points: tuple[int, ...] #indices of the on-board cells, row by row
+    positions: tuple[tuple[int, int], ...] #(row, col) of every index
+    neighbours: tuple[tuple[int, ...], ...] #on-board neighbours of each index
+    neighbour_positions: tuple[tuple[tuple[int, int], ...], ...] #same, as
+                                                                 #positions
+    diagonals: tuple[tuple[int, ...], ...] #on-board diagonal neighbours
+    edge_distance: tuple[int, ...] #lines between each cell and the nearest
+                                   #edge (0 on the first line, -1 off board)
+    corners: tuple[int, ...] #indices of the four corners
+    edges: tuple[int, ...] #indices of the first line, without the corners
+    centre: tuple[int, ...] #indices of every other on-board cell
+    symmetries: tuple[tuple[int, ...], ...] #for each of the eight symmetries,
+                                            #the index each cell is mapped to
+    inverses: tuple[int, ...] #the symmetry undoing each symmetry
+
+    def __init__(self, size: int):
+        """
+        Constructor
+
+        Args:
+            size: length of the board
+
+        Raises: ValueError if the size is not positive
+        """
+        if size < 1:
+            raise ValueError(f"Invalid board size {size}")
+        self.size = size
+        self.stride = stride = size + 2
+        num_cells = stride * stride
+        self.offsets = (-stride, 1, stride, -1)
+
+        cells = bytearray([BORDER]) * num_cells
+        points = []
+        for row in range(1, size + 1):
+            for col in range(1, size + 1):
+                cells[row * stride + col] = EMPTY
+                points.append(row * stride + col)
+        self.cells = bytes(cells)
+        self.points = tuple(points)
+        self.positions = tuple(divmod(index, stride)
+                               for index in range(num_cells))
+
+        def on_board(indices: list[int]) -> tuple[int, ...]:
+            return tuple(index for index in indices if cells[index] == EMPTY)
+
+        self.neighbours = tuple(
+            on_board([index + offset for offset in self.offsets])
+            if cells[index] == EMPTY else ()
+            for index in range(num_cells))
+        self.neighbour_positions = tuple(
+            tuple(self.positions[adjacent] for adjacent in adjacents)
+            for adjacents in self.neighbours)
+        self.diagonals = tuple(
+            on_board([index - stride - 1, index - stride + 1,
+                      index + stride + 1, index + stride - 1])
+            if cells[index] == EMPTY else ()
+            for index in range(num_cells))
+
+        distance = [-1] * num_cells
+        for index in points:
+            row, col = self.positions[index]
+            distance[index] = min(row - 1, col - 1, size - row, size - col)
+        self.edge_distance = tuple(distance)
+        self.corners = tuple(index for index in points
+                             if self.positions[index][0] in (1, size)
+                             and self.positions[index][1] in (1, size))
+        self.edges = tuple(index for index in points if distance[index] == 0
+                           and index not in self.corners)
+        self.centre = tuple(index for index in points if distance[index] > 0)
+
+        symmetries = []
+        for mirror in (False, True):
+            for turns in range(4):
+                mapping = list(range(num_cells))
+                for index in points:
+                    row, col = self.positions[index]
+                    if mirror:
+                        col = size + 1 - col
+                    for _ in range(turns):
+                        row, col = col, size + 1 - row
+                    mapping[index] = row * stride + col
+                symmetries.append(tuple(mapping))
+        self.symmetries = tuple(symmetries)
+        self.inverses = tuple(
+            next(other for other, undo in enumerate(symmetries)
+                 if all(undo[mapping[index]] == index for index in points))
+            for mapping in symmetries)
+
+    def index(self, pos: tuple[int, int]) -> int:
+        """
+        Returns the index of a position in the flat board
+
+        Inputs:
+            pos: a row and a column on the board
+
+        Raises: ValueError if the desired position is not on the board
+        """
+        row, col = pos
+        if not (1 <= row <= self.size and 1 <= col <= self.size):
+            raise ValueError(f"Position {pos} is out of bounds")
+        return row * self.stride + col
+
+    def transform(self, pos: tuple[int, int], symmetry: int) -> tuple[int, int]:
+        """
+        Returns where one of the eight symmetries of the board sends a
+        position
+
+        Inputs:
+            pos: a row and a column on the board
+            symmetry: the number of the symmetry, from 0 to 7
+
+        Raises: ValueError if the desired position is not on the board
+        """
+        return self.positions[self.symmetries[symmetry][self.index(pos)]]
+
+
+@lru_cache(maxsize=None)
+def geometry(size: int) -> Geometry:
+    """
+    Returns the geometry tables of a board of the given size, building them
+    the first time each size is asked for
+
+    Inputs:
+        size: length of the board
+
+    Raises: ValueError if the size is not positive
+    """
+    return Geometry(size)
@@ -1,19 +1,171 @@
 """
 For Go(GoBase)
 """
+import random
+import struct
+import sys
+from array import array
+from functools import lru_cache
 from base import GoBase, BoardGridType, ListMovesType
-from copy import deepcopy
+from geometry import EMPTY, BORDER, Geometry, geometry
+from history import HistoryNode
+
+# Layout of the header of Go.to_bytes: format version, board size, number
+# of players, flags, then the player to move, the consecutive passes and
+# the depth of the starting board, the history limit (0 if none) and the
+# number of moves
+SERIAL_HEADER = struct.Struct("<BBBBBBIII")
+SERIAL_VERSION = 3
+SUPERKO_FLAG = 1
+GAME_OVER_FLAG = 2
+
+@lru_cache(maxsize=None)
+def zobrist_keys(num_cells: int, player: int) -> list[int]:
+    """
+    Returns the 64-bit Zobrist keys of a player for every cell of a flat
+    board with num_cells cells. The keys are generated from a fixed seed,
+    so every process agrees on the hash of a given position.
+
+    Inputs:
+        num_cells: number of cells in the flat board (border included)
+        player: the player number
+
+    Returns: a list with one random 64-bit key per cell
+    """
+    rng = random.Random(num_cells * 1_000_003 + player)
+    return [rng.getrandbits(64) for _ in range(num_cells)]
+
+@lru_cache(maxsize=None)
+def symmetric_zobrist_keys(size: int, player: int) -> list[int]:
+    """
+    Returns the Zobrist keys of a player for every cell of a flat board of
+    the given size, under all eight symmetries of the board (numbered as in
+    Geometry) at once: bits 64 * s to 64 * s + 63 of the key of a cell hold
+    the key of the cell symmetry s sends it to. XORing these keys over the
+    stones of a board gives the hashes of its eight symmetric boards in a
+    single integer.
+
+    Inputs:
+        size: length of the board
+        player: the player number
+
+    Returns: a list with one packed 512-bit key per cell (0 off the board)
+    """
+    geo = geometry(size)
+    keys = zobrist_keys(len(geo.cells), player)
+    packed = [0] * len(geo.cells)
+    for index in geo.points:
+        for symmetry, mapping in enumerate(geo.symmetries):
+            packed[index] |= keys[mapping[index]] << (64 * symmetry)
+    return packed
+
+class MoveResult:
+    """
+    What placing a stone would do to a board, from Board.predict (which
+    leaves the board unchanged). Board.place can commit it afterwards
+    instead of working out the captures again, as long as the board has
+    not changed in between.
+    """
+    __slots__ = ("index", "player", "hash", "suicide", "captured", "friends")
+
+    index: int #index of the cell the stone is placed on
+    player: int #the player placing the stone
+    hash: int #Zobrist hash of the resulting board
+    suicide: bool #whether the stone captures nothing and its own chain is
+                  #left without liberties
+    captured: list[int] #chain ids of the opponent chains it captures
+    friends: list[int] #chain ids of the player's chains it joins
+
+    def __init__(self, index: int, player: int, position_hash: int,
+                 suicide: bool, captured: list[int], friends: list[int]):
+        """
+        Constructor
+
+        Args:
+            index: index of the cell the stone is placed on
+            player: the player placing the stone
+            position_hash: Zobrist hash of the resulting board
+            suicide: whether the move is suicide
+            captured: chain ids of the opponent chains it captures
+            friends: chain ids of the player's chains it joins
+        """
+        self.index = index
+        self.player = player
+        self.hash = position_hash
+        self.suicide = suicide
+        self.captured = captured
+        self.friends = friends
 
 class Board:
     """
     Class for representing a game board
+
+    The board is stored as a single flat bytearray with a one-cell sentinel
+    border around it. Square (row, col), numbered from 1 like the rest of
+    the game, lives at index row * stride + col, so the four neighbours of
+    any square on the board are fixed index offsets and never need a
+    bounds check.
+
+    The board also tracks chains (connected stones of one player) and their
+    liberties. Every stone records the id of its chain (the index of one of
+    its stones) and the next stone of its chain, the stones of a chain
+    forming a loop, so that two chains are merged by swapping two links.
+    Each chain id maps to its size and its liberties, so captures and atari
+    checks never need a flood fill.
+
+    Stone counts are kept per player, and every empty cell is labelled with
+    the empty region it belongs to. Cells changed since the territory was
+    last counted are queued, so that only the regions around them are
+    flood filled again.
     """
+    __slots__ = ("_size", "_stride", "_geometry", "_cells", "_offsets",
+                 "_hash", "_symmetric_hash", "_chain", "_next_stone",
+                 "_chain_size", "_chain_libs", "_empties", "_empty_slot", "_stone_counts",
+                 "_region", "_regions", "_next_region", "_territory",
+                 "_dirty")
+
     _size: int #length of a square board
-    _board: BoardGridType #represents the board
+    _stride: int #length of a row, including the two border cells
+    _geometry: Geometry #shared tables for boards of this size
+    _cells: bytearray #flat board, EMPTY, BORDER or a player number per cell
+    _offsets: tuple[int, int, int, int] #index offsets of the four neighbours
+    _hash: int #Zobrist hash of the stones on the board
+    _symmetric_hash: int #Zobrist hashes of the board under its eight
+                         #symmetries, packed 64 bits per symmetry
+    _chain: array #chain id of the stone in each cell, 0 if empty
+    _next_stone: array #next stone of the chain of each stone, in a loop
+                       #through the whole chain, 0 if empty
+    _chain_size: array #number of stones of each chain, by chain id
+    _chain_libs: dict[int, int] #liberties of each chain, as a bitmask with
+                                #bit i set when cell i is a liberty
+    _empties: array #indices of the empty cells, in no particular order
+    _empty_slot: array #position of each empty cell in _empties, else -1
+    _stone_counts: array #number of stones of each player, by player
+    _region: list[int] #id of the empty region of each cell, 0 if unlabelled
+    _regions: dict[int, tuple[int, int]] #(size, owner) of each region
+    _next_region: int #id to give to the next region
+    _territory: array #territory of each player, by player
+    _dirty: list[int] | None #cells changed since the territory was counted,
+                             #None when every region has to be relabelled
 
     def __init__(self, size: int):
+        self._geometry = geometry(size)
         self._size = size
-        self._board = [[None] * size for _ in range(size)]
+        self._stride = self._geometry.stride
+        self._cells = bytearray(self._geometry.cells)
+        self._offsets = self._geometry.offsets
+        self._hash = 0
+        self._symmetric_hash = 0
+        self._chain = array("H", bytes(2 * len(self._cells)))
+        self._next_stone = self._chain[:]
+        self._chain_size = self._chain[:]
+        self._chain_libs = {}
+        self._empties = array("H", self._geometry.points)
+        self._empty_slot = array("h", [-1]) * len(self._cells)
+        for slot, index in enumerate(self._empties):
+            self._empty_slot[index] = slot
+        self._stone_counts = array("H", bytes(2 * (BORDER + 1)))
+        self._dirty = None
 
     @property
     def size(self) -> int:
@@ -22,17 +174,104 @@ class Board:
         """
         return self._size
 
+    @property
+    def stride(self) -> int:
+        """
+        Length of a row of the flat board, including the border cells
+        """
+        return self._stride
+
+    @property
+    def geometry(self) -> Geometry:
+        """
+        Precomputed tables (neighbours, positions, symmetries...) shared by
+        every board of this size
+        """
+        return self._geometry
+
+    @property
+    def offsets(self) -> tuple[int, int, int, int]:
+        """
+        Index offsets of the four neighbours of a cell (up, right, down, left)
+        """
+        return self._offsets
+
+    @property
+    def cells(self) -> bytearray:
+        """
+        The flat board, one byte per cell (EMPTY, BORDER or a player number)
+        """
+        return self._cells
+
+    @property
+    def empties(self) -> list[int]:
+        """
+        Indices of the empty cells of the board, in no particular order
+        """
+        return self._empties
+
+    @property
+    def stone_counts(self) -> list[int]:
+        """
+        Number of stones on the board for each player, indexed by player
+        """
+        return self._stone_counts
+
+    @property
+    def hash(self) -> int:
+        """
+        Zobrist hash of the stones on the board, kept up to date by every
+        change made through set_piece and set_at
+        """
+        return self._hash
+
+    @property
+    def symmetric_hashes(self) -> tuple[int, ...]:
+        """
+        Zobrist hashes of the board transformed by each of its eight
+        symmetries (numbered as in Geometry), kept up to date like hash.
+        The hash for symmetry 0 (the identity) is hash itself.
+        """
+        packed = self._symmetric_hash
+        return tuple((packed >> (64 * symmetry)) & 0xFFFFFFFFFFFFFFFF
+                     for symmetry in range(8))
+
     @property
     def board(self) -> BoardGridType:
         """
-        Generates board
+        Generates board as a list of lists
         """
-        return self._board
+        cells = self._cells
+        stride = self._stride
+        return [[cells[row * stride + col] or None
+                 for col in range(1, self._size + 1)]
+                for row in range(1, self._size + 1)]
+
+    def index(self, pos: tuple[int, int]) -> int:
+        """
+        Returns the index of a position in the flat board
+
+        Inputs:
+            pos: a row and a column on the board
+
+        Raises: ValueError if the desired position is not on the board
+        """
+        if not self.valid_pos(pos):
+            raise ValueError("Invalid position")
+        row, col = pos
+        return row * self._stride + col
+
+    def position(self, index: int) -> tuple[int, int]:
+        """
+        Returns the (row, col) position of an index in the flat board
+        """
+        return self._geometry.positions[index]
 
     def set_piece(self, player: int | None, pos: tuple[int, int]) -> None:
         """
         Inserts a player piece at a specified row and column, or sets a square
-        to None
+        to None. Unlike place, this never captures anything; the chains
+        around the square are rebuilt to match the new contents.
 
         Inputs:
             player: the player number
@@ -40,13 +279,428 @@ class Board:
 
         Raises: ValueError if the desired position is not on the board
         """
-        row, col = pos
-        row_i, col_i = (row - 1, col - 1)
+        index = self.index(pos)
+        around = [index] + [index + offset for offset in self._offsets]
+        self._drop_chains(around)
+        self._write(index, player or EMPTY)
+        self._build_chains(around)
 
-        try:
-            self._board[row_i][col_i] = player
-        except ValueError:
-            print("Invalid position.")
+    def load(self, grid: BoardGridType) -> None:
+        """
+        Replaces the contents of the board with a grid (a list of lists,
+        as returned by the board property) and rebuilds every chain
+
+        Inputs:
+            grid: the new state of the board
+        """
+        cells = bytearray(self._geometry.cells)
+        for index in self._geometry.points:
+            row, col = self._geometry.positions[index]
+            cells[index] = grid[row - 1][col - 1] or EMPTY
+        self.load_cells(cells)
+
+    def load_cells(self, cells: bytes | bytearray) -> None:
+        """
+        Replaces the contents of the board with a flat board of the same
+        size (laid out like the cells property) and rebuilds every chain
+
+        Inputs:
+            cells: the new state of the board
+        """
+        for index in self._geometry.points:
+            self._write(index, cells[index])
+        self._chain = array("H", bytes(2 * len(self._cells)))
+        self._next_stone = self._chain[:]
+        self._chain_size = self._chain[:]
+        self._chain_libs = {}
+        self._build_chains(range(len(self._cells)))
+        self._dirty = None
+
+    def place(self, index: int, player: int,
+              result: MoveResult | None = None) -> list[int]:
+        """
+        Places a stone on an empty cell and resolves captures. Opponent
+        chains left without liberties are all removed at once; if the new
+        stone's own chain still has no liberties afterwards, it is removed
+        too.
+
+        Inputs:
+            index: index of an empty on-board cell
+            player: the player number
+            result: what predict returned for this move, if the board has
+            not changed since; the chains it captures are then removed
+            without being looked for again
+
+        Returns: the (index, player) of every stone removed from the board
+        """
+        cells = self._cells
+        chain = self._chain
+        chain_libs = self._chain_libs
+
+        self._write(index, player)
+        chain[index] = index
+        self._next_stone[index] = index
+        self._chain_size[index] = 1
+        chain_libs[index] = 0
+        head = index
+        enemies = []
+
+        for adjacent in self._geometry.neighbours[index]:
+            cell = cells[adjacent]
+            if cell == EMPTY:
+                chain_libs[head] |= 1 << adjacent
+            else:
+                other = chain[adjacent]
+                chain_libs[other] &= ~(1 << index)
+                if cell == player:
+                    if other != head:
+                        head = self._merge(head, other)
+                elif result is None and other not in enemies:
+                    enemies.append(other)
+
+        captured = []
+        # decide which chains are dead before removing any of them, since
+        # removing one gives liberties back to its neighbours
+        if result is not None:
+            dead = result.captured
+        else:
+            dead = [enemy for enemy in enemies if not chain_libs[enemy]]
+        for enemy in dead:
+            enemy_player = cells[enemy]
+            captured.extend((stone, enemy_player)
+                            for stone in self._remove_chain(enemy))
+        if not chain_libs[head]:
+            captured.extend((stone, player)
+                            for stone in self._remove_chain(head))
+        return captured
+
+    def unplace(self, index: int,
+                captured: list[tuple[int, int]] | tuple) -> None:
+        """
+        Reverts a call to place: takes the stone back off the board, puts
+        the captured stones back and rebuilds the chains around them
+
+        Inputs:
+            index: index the stone was placed at
+            captured: the list returned by place
+        """
+        offsets = self._offsets
+        changed = [index] + [stone for stone, _ in captured]
+        around = changed + [square + offset
+                            for square in changed for offset in offsets]
+        self._drop_chains(around)
+        self._write(index, EMPTY)
+        for stone, player in captured:
+            # after a suicide, the placed stone is among the captured ones
+            if stone != index:
+                self._write(stone, player)
+        self._build_chains(around)
+
+    def predict(self, index: int, player: int
+                ) -> tuple[int, bool, list[int], list[int]]:
+        """
+        Works out the effect of placing a stone on an empty cell from the
+        chain and liberty data, without changing the board
+
+        Inputs:
+            index: index of an empty on-board cell
+            player: the player number
+
+        Returns: the Zobrist hash of the resulting board, whether the move
+            is suicide (captures nothing and leaves its own chain without
+            liberties), and the chain ids of the opponent chains it
+            captures and of the player's chains it joins (the arguments of
+            MoveResult after index and player)
+        """
+        cells = self._cells
+        chain = self._chain
+        num_cells = len(cells)
+        keys = zobrist_keys(num_cells, player)
+        new_hash = self._hash ^ keys[index]
+        has_liberty = False
+        friends = []
+        captured = []
+
+        for adjacent in self._geometry.neighbours[index]:
+            cell = cells[adjacent]
+            if cell == EMPTY:
+                has_liberty = True
+            else:
+                head = chain[adjacent]
+                if cell == player:
+                    if head not in friends:
+                        friends.append(head)
+                        if self._chain_libs[head].bit_count() > 1:
+                            has_liberty = True
+                elif head not in captured and \
+                        self._chain_libs[head].bit_count() == 1:
+                    # the only liberty of an adjacent chain is this cell
+                    captured.append(head)
+                    enemy_keys = zobrist_keys(num_cells, cell)
+                    for stone in self._stones(head):
+                        new_hash ^= enemy_keys[stone]
+
+        suicide = not has_liberty and not captured
+        if suicide:
+            new_hash ^= keys[index]
+            for head in friends:
+                for stone in self._stones(head):
+                    new_hash ^= keys[stone]
+        return new_hash, suicide, captured, friends
+
+    def territory_counts(self) -> list[int]:
+        """
+        Counts the territory of every player. A region of empty cells
+        bordered by a single player's stones is that player's territory,
+        any other region is neutral. Only the regions around the cells
+        changed since the last call are flood filled again.
+
+        Returns: the territory of each player, indexed by player
+        """
+        if self._dirty is None:
+            self._label_all_regions()
+            return self._territory
+
+        changed = self._dirty
+        if changed:
+            self._dirty = []
+            cells = self._cells
+            region = self._region
+            stale = set()
+            seeds = []
+            for index in changed:
+                for square in (index, index - self._stride, index + 1,
+                               index + self._stride, index - 1):
+                    if region[square]:
+                        stale.add(region[square])
+                    if cells[square] == EMPTY:
+                        seeds.append(square)
+                    else:
+                        region[square] = 0
+            # every cell of a stale region is reachable from the seeds
+            for region_id in stale:
+                size, owner = self._regions.pop(region_id)
+                if owner != EMPTY and owner != BORDER:
+                    self._territory[owner] -= size
+            first_new = self._next_region
+            for seed in seeds:
+                if region[seed] < first_new:
+                    self._label_region(seed)
+        return self._territory
+
+    def scores(self, players: int) -> dict[int, int]:
+        """
+        Returns the score of each player: their stones on the board plus
+        their territory (see territory_counts)
+
+        Inputs:
+            players: the number of players
+        """
+        stones = self._stone_counts
+        territory = self.territory_counts()
+        return {player: stones[player] + territory[player]
+                for player in range(1, players + 1)}
+
+    def _label_all_regions(self) -> None:
+        """
+        Labels every empty region of the board from scratch
+        """
+        self._region = [0] * len(self._cells)
+        self._regions = {}
+        self._next_region = 1
+        self._territory = array("H", bytes(2 * (BORDER + 1)))
+        self._dirty = []
+        for index in self._empties:
+            if not self._region[index]:
+                self._label_region(index)
+
+    def _label_region(self, start: int) -> None:
+        """
+        Flood fills the empty region containing start with a new region id,
+        recording its size, its owner and the territory it gives
+        """
+        cells = self._cells
+        region = self._region
+        region_id = self._next_region
+        self._next_region += 1
+        region[start] = region_id
+        queue = [start]
+        size = 0
+        owner = EMPTY  # EMPTY until a border is found, BORDER if shared
+        while queue:
+            square = queue.pop()
+            size += 1
+            for offset in self._offsets:
+                adjacent = square + offset
+                cell = cells[adjacent]
+                if cell == EMPTY:
+                    if region[adjacent] != region_id:
+                        region[adjacent] = region_id
+                        queue.append(adjacent)
+                elif cell != BORDER and cell != owner:
+                    owner = cell if owner == EMPTY else BORDER
+        self._regions[region_id] = (size, owner)
+        if owner != EMPTY and owner != BORDER:
+            self._territory[owner] += size
+
+    def chain_id(self, index: int) -> int:
+        """
+        Returns the id of the chain at an index, 0 if the cell is empty
+        """
+        return self._chain[index]
+
+    def chain_stones(self, index: int) -> list[int]:
+        """
+        Returns the indices of the stones in the chain at an index
+        """
+        head = self._chain[index]
+        return self._stones(head) if head else []
+
+    def chain_liberties(self, index: int) -> list[int]:
+        """
+        Returns the indices of the liberties of the chain at an index
+        """
+        libs = self._chain_libs.get(self._chain[index], 0)
+        liberties = []
+        while libs:
+            low = libs & -libs
+            liberties.append(low.bit_length() - 1)
+            libs ^= low
+        return liberties
+
+    def _write(self, index: int, value: int) -> None:
+        """
+        Sets a cell of the flat board and updates the Zobrist hash, without
+        touching the chains
+
+        Inputs:
+            index: index of an on-board cell
+            value: EMPTY or a player number
+        """
+        old = self._cells[index]
+        if self._dirty is not None:
+            self._dirty.append(index)
+            if len(self._dirty) > len(self._cells):
+                self._dirty = None
+        if old != EMPTY:
+            self._hash ^= zobrist_keys(len(self._cells), old)[index]
+            self._symmetric_hash ^= \
+                symmetric_zobrist_keys(self._size, old)[index]
+            self._stone_counts[old] -= 1
+        elif value != EMPTY:
+            # swap the last empty cell into this one's slot
+            slot = self._empty_slot[index]
+            last = self._empties.pop()
+            if last != index:
+                self._empties[slot] = last
+                self._empty_slot[last] = slot
+            self._empty_slot[index] = -1
+        if value != EMPTY:
+            self._hash ^= zobrist_keys(len(self._cells), value)[index]
+            self._symmetric_hash ^= \
+                symmetric_zobrist_keys(self._size, value)[index]
+            self._stone_counts[value] += 1
+        elif old != EMPTY:
+            self._empty_slot[index] = len(self._empties)
+            self._empties.append(index)
+        self._cells[index] = value
+
+    def _merge(self, head: int, other: int) -> int:
+        """
+        Merges two chains of the same player, relabelling the smaller one
+
+        Returns: the id of the merged chain
+        """
+        size = self._chain_size
+        if size[head] < size[other]:
+            head, other = other, head
+        for stone in self._stones(other):
+            self._chain[stone] = head
+        # splice the two loops of stones into one
+        next_stone = self._next_stone
+        next_stone[head], next_stone[other] = next_stone[other], next_stone[head]
+        size[head] += size[other]
+        size[other] = 0
+        self._chain_libs[head] |= self._chain_libs.pop(other)
+        return head
+
+    def _stones(self, head: int) -> list[int]:
+        """
+        Returns the indices of the stones of a chain, from its id
+        """
+        next_stone = self._next_stone
+        stones = [head]
+        stone = next_stone[head]
+        while stone != head:
+            stones.append(stone)
+            stone = next_stone[stone]
+        return stones
+
+    def _remove_chain(self, head: int) -> list[int]:
+        """
+        Removes a chain from the board, giving its cells back as liberties
+        to the neighbouring chains
+
+        Returns: the indices of the removed stones
+        """
+        chain = self._chain
+        stones = self._stones(head)
+        self._chain_size[head] = 0
+        del self._chain_libs[head]
+        for stone in stones:
+            self._write(stone, EMPTY)
+            chain[stone] = 0
+            self._next_stone[stone] = 0
+        for stone in stones:
+            for offset in self._offsets:
+                other = chain[stone + offset]
+                if other:
+                    self._chain_libs[other] |= 1 << stone
+        return stones
+
+    def _drop_chains(self, indices) -> None:
+        """
+        Forgets the chains of the stones at the given indices
+        """
+        for index in indices:
+            head = self._chain[index]
+            if head:
+                for stone in self._stones(head):
+                    self._chain[stone] = 0
+                    self._next_stone[stone] = 0
+                self._chain_size[head] = 0
+                del self._chain_libs[head]
+
+    def _build_chains(self, indices) -> None:
+        """
+        Flood fills a chain from every stone at the given indices that does
+        not belong to a chain yet
+        """
+        cells = self._cells
+        chain = self._chain
+        for index in indices:
+            player = cells[index]
+            if player == EMPTY or player == BORDER or chain[index]:
+                continue
+            chain[index] = index
+            stones = [index]
+            libs = 0
+            queue = [index]
+            while queue:
+                square = queue.pop()
+                for offset in self._offsets:
+                    adjacent = square + offset
+                    cell = cells[adjacent]
+                    if cell == EMPTY:
+                        libs |= 1 << adjacent
+                    elif cell == player and not chain[adjacent]:
+                        chain[adjacent] = index
+                        stones.append(adjacent)
+                        queue.append(adjacent)
+            for stone, following in zip(stones, stones[1:] + stones[:1]):
+                self._next_stone[stone] = following
+            self._chain_size[index] = len(stones)
+            self._chain_libs[index] = libs
 
     def get_player_at(self, pos: tuple[int, int]) -> int | None:
         """
@@ -57,13 +711,7 @@ class Board:
 
         Raises: ValueError if the desired position is not on the board
         """
-        row, col = pos
-        row_i, col_i = (row - 1, col - 1)
-
-        if not 0 <= row_i < self._size or not 0 <= col_i < self._size:
-            raise ValueError("Invalid position")
-
-        return self._board[row_i][col_i]
+        return self._cells[self.index(pos)] or None
 
     def valid_pos(self, pos: tuple[int, int]) -> bool:
         """
@@ -77,28 +725,93 @@ class Board:
         row, col = pos
         return 1 <= row <= self._size and 1 <= col <= self._size
 
+    def copy(self) -> "Board":
+        """
+        Returns an independent copy of the board
+        """
+        board = Board.__new__(Board)
+        board._size = self._size
+        board._stride = self._stride
+        board._geometry = self._geometry
+        board._cells = self._cells[:]
+        board._offsets = self._offsets
+        board._hash = self._hash
+        board._symmetric_hash = self._symmetric_hash
+        board._chain = self._chain[:]
+        board._next_stone = self._next_stone[:]
+        board._chain_size = self._chain_size[:]
+        board._chain_libs = self._chain_libs.copy()
+        board._empties = self._empties[:]
+        board._empty_slot = self._empty_slot[:]
+        board._stone_counts = self._stone_counts[:]
+        board._dirty = None if self._dirty is None else self._dirty[:]
+        if self._dirty is not None:
+            board._region = self._region[:]
+            board._regions = self._regions.copy()
+            board._next_region = self._next_region
+            board._territory = self._territory[:]
+        return board
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Board):
             return NotImplemented
-        return self._board == other._board
+        return self._cells == other._cells
+
 
 class Go(GoBase):
     """
     This is the Go Class, inheriting from GoBase 
     """
+    __slots__ = ("_board", "_game_over", "_history", "_history_limit",
+                 "_seen_hashes", "_shared", "_consecutive_passes", "_turn",
+                 "_redo_stack", "_checked")
+
     _board: Board #the game board
     _game_over: bool #holds whether the game is over or not
-    _past_states: list[Board] #holds all past states of the game board
+    _history: HistoryNode #latest entry of the history of moves and states
+    _history_limit: int | None #number of moves kept in the history, None
+                               #to keep every move
+    _seen_hashes: dict[int, int] | None #how often each hash occurs in the
+                                        #history, None under simple ko
+    _shared: bool #whether _board and _seen_hashes are shared with a clone
     _consecutive_passes: int #the number of consecutive passes
     _turn: int #the current player whose turn it is
+    _redo_stack: ListMovesType #undone moves (None for a pass), latest last
+    _checked: MoveResult | None #the latest move check_move found legal,
+                                #None once the board or turn has changed
 
-    def __init__(self, side: int, players: int, superko: bool = False):
+    def __init__(self, side: int, players: int, superko: bool = False,
+                 history_limit: int | None = None):
+        """
+        Constructor
+
+        Args:
+            side: Number of squares on each side of the board
+            players: Number of players
+            superko: If True, the superko rule is in effect, otherwise the
+            simple ko rule is
+            history_limit: If given, only the latest history_limit moves
+            (at least) are kept in the history, so that a game uses the
+            same memory however long it lasts; older moves can no longer
+            be undone. Only allowed under the simple ko rule, which never
+            looks further back than the previous board.
+
+        Raises: ValueError if history_limit is not positive, or is given
+            under the superko rule
+        """
         super().__init__(side, players, superko)
+        if history_limit is not None:
+            if history_limit < 1:
+                raise ValueError(f"Invalid history limit {history_limit}")
+            if superko:
+                raise ValueError("The superko rule needs the whole history")
+        self._history_limit = history_limit
         self._board = Board(side)
         self._game_over = False
-        self._past_states = []
         self._consecutive_passes = 0
         self._turn = 1
+        self._shared = False
+        self.reset_history()
 
     @property
     def grid(self) -> BoardGridType:
@@ -113,12 +826,120 @@ class Go(GoBase):
         if self._game_over:
             return []
 
-        moves = []
-        for x in range(1, self._side + 1):
-            for y in range(1, self._side + 1):
-                if self._board.get_player_at((x,y)) is None:
-                    moves.append((x,y))
-        return moves
+        return self.moves()
+
+    @property
+    def geometry(self) -> Geometry:
+        """
+        Precomputed tables (neighbours, positions, corners, edges,
+        symmetries...) of the board, shared by every game of this size
+        """
+        return self._board.geometry
+
+    @property
+    def position_hash(self) -> int:
+        """
+        Zobrist hash of the current board position
+        """
+        return self._board.hash
+
+    @property
+    def passes(self) -> int:
+        """
+        Number of consecutive passes just played (the game is over when
+        every player has passed)
+        """
+        return self._consecutive_passes
+
+    @property
+    def cells(self) -> bytearray:
+        """
+        The flat board (laid out as in Geometry), one byte per cell: EMPTY,
+        BORDER or a player number. It is read-only for callers.
+        """
+        return self._board.cells
+
+    @property
+    def empties(self) -> array:
+        """
+        Indices of the empty cells of the board, in no particular order.
+        Playing or trying a move reorders them, so copy them first to keep
+        going through them meanwhile.
+        """
+        return self._board.empties
+
+    @property
+    def stone_counts(self) -> list[int]:
+        """
+        Number of stones on the board for each player, indexed by player
+        """
+        return self._board.stone_counts
+
+    def territory_counts(self) -> list[int]:
+        """
+        Returns the territory of each player, indexed by player (only the
+        regions changed since the last call are counted again)
+        """
+        return self._board.territory_counts()
+
+    @property
+    def last_move(self) -> tuple[int, tuple[tuple[int, int], ...]]:
+        """
+        The latest move in the history: the index of the stone it placed
+        (0 for a pass, or when nothing has been played), and the (index,
+        player) of every stone it removed from the board
+        """
+        node = self._history
+        return node.index, node.captured
+
+    @property
+    def canonical_key(self) -> tuple[int, int]:
+        """
+        Key of the current board position shared by all of its rotations
+        and reflections, for caches that should treat symmetric positions
+        as one. Like position_hash, it only depends on the stones, so
+        combine it with turn where the player to move matters.
+
+        Returns: the smallest of the Zobrist hashes of the eight symmetric
+            boards, and the symmetry (numbered as in Geometry) that turns
+            the current board into the canonical one
+        """
+        hashes = self._board.symmetric_hashes
+        key = min(hashes)
+        return key, hashes.index(key)
+
+    def canonical_move(self, pos: tuple[int, int] | None,
+                       symmetry: int) -> tuple[int, int] | None:
+        """
+        Maps a move on the current board to the same move on the canonical
+        board
+
+        Inputs:
+            pos: a board position (row, col), or None for a pass
+            symmetry: the symmetry returned by canonical_key
+
+        Raises: ValueError if the position is not on the board
+        """
+        if pos is None:
+            return None
+        return self.geometry.transform(pos, symmetry)
+
+    def original_move(self, pos: tuple[int, int] | None,
+                      symmetry: int) -> tuple[int, int] | None:
+        """
+        Maps a move on the canonical board back to the same move on the
+        current board (the inverse of canonical_move)
+
+        Inputs:
+            pos: a board position (row, col), or None for a pass
+            symmetry: the symmetry returned by canonical_key
+
+        Raises: ValueError if the position is not on the board
+        """
+        if pos is None:
+            return None
+        geo = self.geometry
+        return geo.transform(pos, geo.inverses[symmetry])
 
     @property
     def done(self) -> bool:
@@ -143,109 +964,453 @@ class Go(GoBase):
         return self._board.get_player_at(pos)
 
     def legal_move(self, pos: tuple[int, int]) -> bool:
+        return self.check_move(pos) is not None
+
+    def check_move(self, pos: tuple[int, int]) -> MoveResult | None:
+        """
+        Works out what placing a piece of the current player at a position
+        would do, if it is legal. The result of the latest legal check is
+        kept until the board changes, so that apply_move commits it rather
+        than working it out again (for instance after the interface has
+        called legal_move on the same position).
+
+        Inputs:
+            pos: a board position (row, col)
+
+        Returns: the effect of the move, or None if it is not legal
+
+        Raises: ValueError if the position is not on the board
+        """
         if not self._board.valid_pos(pos):
             raise ValueError(f"Position {pos} is out of bounds")
-        
+
         if self._game_over:
-            return False
+            return None
+
+        board = self._board
+        index = board.index(pos)
+        checked = self._checked
+        if checked is not None and checked.index == index:
+            return checked
+        if board.cells[index] != EMPTY:
+            return None
+        result = MoveResult(index, self._turn,
+                            *board.predict(index, self._turn))
+        self._checked = result
+        if self._repeats_position(index, result.hash):
+            self._checked = None
+            return None
+        if self._checked is None:
+            # the move was tried on the board, which rebuilds the chains
+            # around it, so the chain ids in the result are out of date
+            result = MoveResult(index, self._turn,
+                                *board.predict(index, self._turn))
+            self._checked = result
+        return result
+
+    def moves(self, legal_only: bool = False) -> ListMovesType:
+        """
+        Returns the empty positions where the current player could place a
+        piece, in no particular order
 
+        Inputs:
+            legal_only: if True, also leave out the positions where playing
+            would be suicide or would break the ko (or superko) rule. This
+            is worked out from the chain and liberty data, and a move is
+            only tried on the board when its hash matches a past position.
+
+        Returns: a list of positions, empty if the game is over
+        """
+        if self._game_over:
+            return []
+
+        board = self._board
+        stride = board.stride
+        if not legal_only:
+            return [divmod(index, stride) for index in board.empties]
+
+        moves = []
+        # trying a move for the ko rule moves cells around in the list of
+        # empty cells, so the list is copied first
+        for index in board.empties.tolist():
+            new_hash, suicide, _, _ = board.predict(index, self._turn)
+            if not suicide and not self._repeats_position(index, new_hash):
+                moves.append(divmod(index, stride))
+        return moves
+
+    def _repeats_position(self, index: int, new_hash: int) -> bool:
+        """
+        Determines whether placing a stone at index, leading to a board with
+        hash new_hash, breaks the ko (or superko) rule. The move is only
+        tried on the board when new_hash matches a past position.
+        """
         if self._superko:
-            return self._board.valid_pos(pos) and \
-                self._board.get_player_at(pos) is None and \
-                not self.would_violate_superko(pos)
+            return new_hash in self._seen_hashes and \
+                self.would_violate_superko(self._board.position(index))
 
-        return self._board.valid_pos(pos) and \
-            self._board.get_player_at(pos) is None and \
-            not self.would_violate_ko(pos)
+        previous = self._history.previous_state()
+        return previous is not None and new_hash == previous.hash and \
+            self.would_violate_ko(self._board.position(index))
         
     def would_violate_ko(self, pos: tuple[int, int]) -> bool:
         """
         Describes whether or not a move violates the ko rule.
+
+        The move is tried on the board and taken back straight away, which
+        rebuilds the chains around it (and forgets the latest checked move).
+        A board shared with a clone is copied first, since the chains of
+        the other game must stay as they are.
         """
-        simulated_board = self.simulate_move(pos)
+        previous = self._history.previous_state()
+        if previous is None:
+            return False
 
-        if len(self._past_states) > 1:
-            return simulated_board._board == self._past_states[-2]
-        return False
+        self._unshare()
+        board = self._board
+        index = board.index(pos)
+        captured = board.place(index, self._turn)
+        # only compare the full boards when the hashes collide
+        repeated = board.hash == previous.hash and board.cells == previous.cells()
+        board.unplace(index, captured)
+        self._checked = None
+        return repeated
 
     def would_violate_superko(self, pos: tuple[int, int]) -> bool:
         """
         Describes whether or not a move violates the superko rule.
-        """
-        simulated_board = self.simulate_move(pos)
 
-        for past_state in self._past_states:
-            if simulated_board == past_state:
-                return True
-        return False
+        The move is tried on the board and taken back straight away, which
+        rebuilds the chains around it (and forgets the latest checked move).
+        A board shared with a clone is copied first, since the chains of
+        the other game must stay as they are.
+        """
+        self._unshare()
+        board = self._board
+        index = board.index(pos)
+        captured = board.place(index, self._turn)
+        new_hash = board.hash
+        repeated = False
+        if self._seen_hashes is None or new_hash in self._seen_hashes:
+            # only compare the full boards when the hashes collide
+            for past in self._history.states():
+                if past.hash == new_hash and board.cells == past.cells():
+                    repeated = True
+                    break
+        board.unplace(index, captured)
+        self._checked = None
+        return repeated
 
     def apply_move(self, pos: tuple[int, int]) -> None:
         if not self._board.valid_pos(pos):
             raise ValueError("Position is outside the bounds of game board")
 
-        if self.legal_move(pos):
-            self._board.set_piece(self._turn, pos)
-            self.capture_pieces(pos)
-            self._consecutive_passes = 0
-            self.switch_turn()
-
-            self._past_states.append(deepcopy(self._board))
+        result = self.check_move(pos)
+        if result is not None:
+            self._redo_stack = []
+            self._play(pos, result)
 
     def pass_turn(self) -> None:
-        self._turn = (self._turn % self._players) + 1
-        self._consecutive_passes += 1
+        self.play(None)
 
-        if self._consecutive_passes >= self._players:
-            self._game_over = True
+    def play(self, pos: tuple[int, int] | None) -> None:
+        """
+        Plays a move (or a pass, if pos is None) for the current player
+        without checking that it is legal, recording what changed so that
+        it can be taken back with undo.
+
+        Inputs:
+            pos: a board position (row, col), or None for a pass
+
+        Raises: ValueError if the position is not on the board, or is not
+            empty
+        """
+        if pos is not None and self._board.get_player_at(pos) is not None:
+            raise ValueError("Position is already occupied")
+        self._redo_stack = []
+        self._play(pos)
+
+    def undo(self) -> None:
+        """
+        Takes back the last move or pass, restoring the board, the turn,
+        the pass counter and the history of past states. With a history
+        limit, only the moves still in the history can be taken back.
+
+        Raises: ValueError if there is no move to undo
+        """
+        node = self._history
+        parent = node.parent
+        # a trimmed history starts deeper than 0, and its first board is
+        # only kept as the board before a placement (for the ko rule)
+        if parent is None or parent.previous_state() is None and \
+                parent.latest_state().depth:
+            raise ValueError("There is no move to undo")
+
+        if node.index:
+            self._unshare()
+            self._board.unplace(node.index, node.captured)
+            self._redo_stack.append(self._board.position(node.index))
+        else:
+            self._redo_stack.append(None)
+        self.forget_state()
+
+        self._turn = node.turn
+        self._consecutive_passes = node.passes
+        self._game_over = node.game_over
+
+    def redo(self) -> None:
+        """
+        Plays again the last move taken back with undo
+
+        Raises: ValueError if there is no move to redo
+        """
+        if not self._redo_stack:
+            raise ValueError("There is no move to redo")
+        self._play(self._redo_stack.pop())
+
+    def _play(self, pos: tuple[int, int] | None,
+              result: MoveResult | None = None) -> None:
+        """
+        Plays a move or pass and adds it to the history, committing the
+        result of check_move for the move if there is one
+        """
+        turn = self._turn
+        passes = self._consecutive_passes
+        game_over = self._game_over
+
+        if pos is None:
+            index = 0
+            captured = ()
+            self._consecutive_passes += 1
+            if self._consecutive_passes >= self._players:
+                self._game_over = True
+        else:
+            index = self._board.index(pos)
+            self._unshare()
+            captured = tuple(self._board.place(index, turn, result))
+            self._consecutive_passes = 0
+
+        self.switch_turn()
+        self.record_state(index, captured, turn, passes, game_over)
 
     def scores(self) -> dict[int, int]:
-        scores = {player:0 for player in range(1, self._players + 1)}
-        for row in range(self._board.size):
-            for col in range(self._board.size):
-                player = self._board.get_player_at((row + 1, col + 1))
-                if player is not None:
-                    scores[player] += 1
-        for player in range(1, self._players + 1):
-            territory = self.calculate_territory(player)
-            scores[player] += territory
-        return scores
+        return self._board.scores(self._players)
 
     def load_game(self, turn: int, grid: BoardGridType) -> None:
 
         self._turn = turn
-
-        for x in range(1, self._board.size +1):
-            for y in range(1, self._board.size +1):
-                player = grid[x-1][y-1]
-                self._board.set_piece(player, (x,y))
+        self._unshare()
+        self._board.load(grid)
 
         self._game_over = False
         self._consecutive_passes = 0
-        self._past_states = [deepcopy(self._board)]
+        self.reset_history()
 
     def simulate_move(self, pos: tuple[int, int] | None) -> "GoBase":
-        simulated_game = deepcopy(self)
+        if pos is not None and not self._board.valid_pos(pos):
+            raise ValueError("Position is outside bounds of the board.")
+
+        simulated_game = self.clone()
+        if pos is not None and self._board.get_player_at(pos) is not None:
+            # the stone already there is replaced, as if the cell had been
+            # empty; that cannot be taken back, so the history of the copy
+            # starts again from the board without the old stone
+            simulated_game._unshare()
+            simulated_game._board.set_piece(None, pos)
+            simulated_game.reset_history()
+        simulated_game.play(pos)
+        return simulated_game
 
-        if pos is not None:
-            if not simulated_game._board.valid_pos(pos):
-                raise ValueError("Position is outside bounds of the board.")
+    def clone(self) -> "Go":
+        """
+        Returns an independent copy of the game.
 
-            simulated_game._board.set_piece(simulated_game.turn, pos)
-            simulated_game.capture_pieces(pos)
-            simulated_game._consecutive_passes = 0
-            simulated_game.switch_turn()
+        The copy shares the (immutable) history with this game, and shares
+        the board until either of them changes it, at which point the one
+        changing it takes its own copy of the board (see _unshare). That
+        includes the moves tried on the board for the ko and superko
+        rules. The copy starts with nothing to redo.
+        """
+        game = Go.__new__(Go)
+        game._side = self._side
+        game._players = self._players
+        game._superko = self._superko
+        game._board = self._board
+        game._game_over = self._game_over
+        game._history = self._history
+        game._history_limit = self._history_limit
+        game._seen_hashes = self._seen_hashes
+        game._consecutive_passes = self._consecutive_passes
+        game._turn = self._turn
+        game._redo_stack = []
+        game._checked = None
+        game._shared = True
+        self._shared = True
+        return game
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs the game into a compact binary form, read back by from_bytes
+        (and used to pickle games). Holds the rules, the starting board of
+        the history (with its turn and passes) with as few bits per point
+        as the number of players allows (2 for up to 3 players), and every
+        move since as a 2-byte board index (0 for a pass). The moves are
+        enough to rebuild the turn, the pass counter and every past board,
+        so the restored game follows the ko and superko rules and can undo
+        like this one; only the moves to redo are not kept.
+
+        Returns (bytes): the packed game
+        """
+        moves = array("H")
+        node = self._history
+        while node.parent is not None:
+            moves.append(node.index)
+            node = node.parent
+        moves.reverse()
+        if sys.byteorder == "big":
+            moves.byteswap()
+
+        bits = max(2, self._players.bit_length())
+        cells = node.keyframe
+        packed = 0
+        for index in reversed(self.geometry.points):
+            packed = packed << bits | cells[index]
+        num_bytes = (self._side * self._side * bits + 7) // 8
+
+        flags = (SUPERKO_FLAG if self._superko else 0) | \
+            (GAME_OVER_FLAG if node.game_over else 0)
+        header = SERIAL_HEADER.pack(SERIAL_VERSION, self._side, self._players,
+                                    flags, node.turn, node.passes, node.depth,
+                                    self._history_limit or 0, len(moves))
+        return header + packed.to_bytes(num_bytes, "little") + moves.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Go":
+        """
+        Rebuilds a game packed by to_bytes, replaying its moves from the
+        starting board
 
-            simulated_game._past_states.append(self._board)
-        else:
-            simulated_game.pass_turn()
+        Inputs:
+            data: the bytes returned by to_bytes
 
-        return simulated_game
+        Raises: ValueError if the data is not a game packed by to_bytes
+        """
+        if len(data) < SERIAL_HEADER.size:
+            raise ValueError("Game data is truncated")
+        version, side, players, flags, turn, passes, depth, limit, \
+            num_moves = SERIAL_HEADER.unpack_from(data)
+        if version != SERIAL_VERSION:
+            raise ValueError(f"Unsupported game data version {version}")
+        if side < 1 or players < 1 or not 1 <= turn <= players:
+            raise ValueError("Game data is corrupt")
+
+        bits = max(2, players.bit_length())
+        num_bytes = (side * side * bits + 7) // 8
+        start = SERIAL_HEADER.size
+        if len(data) != start + num_bytes + 2 * num_moves:
+            raise ValueError("Game data has the wrong length")
+        packed = int.from_bytes(data[start:start + num_bytes], "little")
+        mask = (1 << bits) - 1
+        grid = []
+        for _ in range(side):
+            row = []
+            for _ in range(side):
+                player = packed & mask
+                if player > players:
+                    raise ValueError(f"Game data has invalid player {player}")
+                row.append(player or None)
+                packed >>= bits
+            grid.append(row)
+
+        moves = array("H")
+        moves.frombytes(data[start + num_bytes:])
+        if sys.byteorder == "big":
+            moves.byteswap()
+
+        game = cls(side, players, bool(flags & SUPERKO_FLAG), limit or None)
+        game.load_game(turn, grid)
+        game._consecutive_passes = passes
+        game._game_over = bool(flags & GAME_OVER_FLAG)
+        game.reset_history()
+        game._history.depth = depth
+        geo = game.geometry
+        for index in moves:
+            if index and (index >= len(geo.cells) or geo.cells[index] != EMPTY
+                          or game._board.cells[index] != EMPTY):
+                raise ValueError(f"Game data has invalid move {index}")
+            game._play(geo.positions[index] if index else None)
+        return game
+
+    def __reduce__(self):
+        return type(self).from_bytes, (self.to_bytes(),)
+
+    def _unshare(self) -> None:
+        """
+        Takes a private copy of the board and the seen hashes if they are
+        shared with a clone, before they are modified
+        """
+        if self._shared:
+            self._board = self._board.copy()
+            if self._seen_hashes is not None:
+                self._seen_hashes = self._seen_hashes.copy()
+            self._shared = False
+
+    def reset_history(self) -> None:
+        """
+        Starts a new history whose only entry is the current board
+        """
+        position_hash = self._board.hash
+        self._history = HistoryNode(None, 0, (), self._turn,
+                                    self._consecutive_passes, self._game_over,
+                                    position_hash, self._board.cells)
+        # only the superko rule looks further back than the previous board
+        self._seen_hashes = {position_hash: 1} if self._superko else None
+        self._redo_stack = []
+        self._checked = None
+
+    def record_state(self, index: int, captured: tuple[tuple[int, int], ...],
+                     turn: int, passes: int, game_over: bool) -> None:
+        """
+        Adds a move, and the board it led to, to the history
+
+        Inputs:
+            index: flat board index of the stone placed, 0 for a pass
+            captured: (index, player) of every stone the move removed
+            turn: player who made the move
+            passes: consecutive passes before the move
+            game_over: whether the game was over before the move
+        """
+        self._checked = None
+        position_hash = self._board.hash
+        self._history = HistoryNode(self._history, index, captured, turn,
+                                    passes, game_over, position_hash,
+                                    self._board.cells)
+        limit = self._history_limit
+        if limit is not None and self._history.depth % limit == 0:
+            # trimming every limit moves keeps the cost constant per move
+            self._history = self._history.trimmed(limit)
+        if index and self._seen_hashes is not None:
+            self._seen_hashes[position_hash] = \
+                self._seen_hashes.get(position_hash, 0) + 1
+
+    def forget_state(self) -> None:
+        """
+        Removes the latest entry from the history
+        """
+        node = self._history
+        self._history = node.parent
+        self._checked = None
+        if node.index and self._seen_hashes is not None:
+            if self._seen_hashes[node.hash] == 1:
+                del self._seen_hashes[node.hash]
+            else:
+                self._seen_hashes[node.hash] -= 1
 
     def switch_turn(self) -> None:
         """
         Switch to the next player's turn in a cyclic manner.
         """
         self._turn = (self._turn % self._players) + 1
+        self._checked = None
 
     def adjacent_positions(self, pos: tuple[int,int]) -> ListMovesType:
         """
@@ -258,83 +1423,57 @@ class Go(GoBase):
         Returns: a list of all the adjacent square posiitons, an empty list if 
             the input position is not valid
         """
-        row, col = pos
-        surrounding = [(row - 1, col), (row, col + 1),
-                       (row + 1, col), (row, col - 1)]
-        adjacent = []
-
-        for square in surrounding:
-            if self._board.valid_pos(square):
-                adjacent.append(square)
-
-        return adjacent
+        if not self._board.valid_pos(pos):
+            return []
+        geo = self._board.geometry
+        return list(geo.neighbour_positions[geo.index(pos)])
 
-    def connection(self, pos: tuple[int,int]) -> ListMovesType | None:
+    def chain_at(self, pos: tuple[int, int]) -> ListMovesType:
         """
-        Returns a list of all the square posiitons (row, col) in a connected
-        block at a given position
+        Returns the positions of all the stones in the chain (connected
+        block of one player's pieces) at a given position
 
         Inputs:
             pos: a board position (row, col)
 
-        Returns: a list of all the square positions that comprise of block of
-            the same player's pieces at pos, None if there is not a piece at pos
-        """
-        player = self._board.get_player_at(pos)
-        group = []
-        queue = []
-        queue.append(pos)
+        Raises: ValueError if the position is not on the board
 
-        while queue:
-            square = queue.pop()
-            group.append(square)
-            for adjacent in self.adjacent_positions(square):
-                if not adjacent in group and \
-                    self._board.get_player_at(adjacent) == player:
-                    queue.append(adjacent)
-        return group
-
-    def reset_squares(self, squares: ListMovesType):
+        Returns: a sorted list of the chain's positions, an empty list if
+            there is no piece at pos
         """
-        Removes all the pieces in a given a list of squares
+        index = self._board.index(pos)
+        return sorted(self._board.position(stone)
+                      for stone in self._board.chain_stones(index))
 
-        Inputs:
-            squares: a list of squares on the board (row, col)
+    def liberties(self, pos: tuple[int, int]) -> ListMovesType:
         """
-        for square in squares:
-            if self._board.valid_pos(square):
-                self._board.set_piece(None, square)
-
-    def is_surrounded_block(self, block: ListMovesType) -> bool:
-        """
-        Determines if a block of a player's pieces are surrounded by other
-        players' pieces (has no liberties)
+        Returns the liberties (adjacent empty squares) of the chain at a
+        given position
 
         Inputs:
-            block: a list of square positions that comprise a block
+            pos: a board position (row, col)
 
-        Returns: True if the block has no liberties, False otherwise
+        Raises: ValueError if the position is not on the board
+
+        Returns: a sorted list of the liberty positions, an empty list if
+            there is no piece at pos
         """
-        if block is not None:
-            for square in block:
-                for adjacent in self.adjacent_positions(square):
-                    if self._board.get_player_at(adjacent) is None:
-                        return False
-        return True
+        index = self._board.index(pos)
+        return sorted(self._board.position(liberty)
+                      for liberty in self._board.chain_liberties(index))
 
-    def capture_pieces(self, pos: tuple[int, int]) -> None:
+    def in_atari(self, pos: tuple[int, int]) -> bool:
         """
-        Removes all pieces/blocks that are surrounded once a move is played
+        Determines if the chain at a given position has a single liberty left
 
         Inputs:
-            pos: the position at which the most recent move was played
-        """
-        check_squares = [square for square in self.adjacent_positions(pos)] + [pos]
+            pos: a board position (row, col)
 
-        for square in check_squares:
-            block = self.connection(square)
-            if block is not None and self.is_surrounded_block(block):
-                self.reset_squares(block)
+        Raises: ValueError if the position is not on the board
+        """
+        index = self._board.index(pos)
+        return self._board.chain_id(index) != 0 and \
+            len(self._board.chain_liberties(index)) == 1
 
     def calculate_territory(self, player: int) -> int:
         """
@@ -347,34 +1486,18 @@ class Go(GoBase):
         Returns:
             int: number of empty board positions within the players territory
         """
-        count = 0
-        # iterate through the board
-        for row in range(1, self._side + 1):
-            for col in range(1, self._side + 1):
-                square = self._board.get_player_at((row,col))
-                # find empty, unvisited squares
-                if square is None and (row, col):
-                    # bfs
-                    visited = set()
-                    queue = [(row, col)]
-                    territory = []
-                    while queue:
-                        c_square = queue.pop()
-                        visited.add(c_square)
-                        territory.append(c_square)
-                        for adjacent in self.adjacent_positions(c_square):
-                            if adjacent in visited:
-                                continue
-                            if self._board.get_player_at(adjacent) is None:
-                                queue.append(adjacent)
-                            # this is not player's territory, terminate search
-                            elif self._board.get_player_at(adjacent) != player:
-                                queue = []
-                                territory = []
-                                visited = set()
-                                break
-
-                    count += len(territory)
-
-        return count
-    
\ No newline at end of file
+        return self.territory()[player]
+
+    def territory(self) -> dict[int, int]:
+        """
+        Calculates the territory of every player. A region of empty squares
+        bordered by a single player's stones is that player's territory,
+        any other region is neutral. The board keeps each region labelled,
+        so only the regions changed since the last call are counted again.
+
+        Returns: Dictionary mapping player numbers to the number of empty
+            board positions within their territory
+        """
+        territory = self._board.territory_counts()
+        return {player: territory[player]
+                for player in range(1, self._players + 1)}
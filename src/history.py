@@ -0,0 +1,177 @@
+"""
+History of past moves and board states for Go
+"""
+
+# Number of placements between two full copies of the board in the history
+KEYFRAME_INTERVAL = 32
+
+# Cell value of an empty intersection (same as go.EMPTY)
+EMPTY = 0
+
+
+class HistoryNode:
+    """
+    One entry in the history of a game: a move (or pass), what it captured,
+    the turn state from before it and the hash of the board it led to.
+
+    Each node points to the node before it, and nodes are never modified
+    once created, so a game and all of its clones share the nodes of their
+    common past. Undoing a move just steps back to the parent node.
+
+    To keep the history compact, only the first node and every
+    KEYFRAME_INTERVAL-th placement keep a full copy of the board cells
+    (a keyframe). Any other board is rebuilt by replaying the moves after
+    the nearest keyframe before it.
+
+    The first node holds the starting board, with the player to move, the
+    consecutive passes and whether the game was over at that point.
+    """
+    __slots__ = ("parent", "index", "captured", "turn", "passes",
+                 "game_over", "hash", "keyframe", "since_keyframe", "depth")
+
+    parent: "HistoryNode | None" #the previous entry, None for the first one
+    index: int #flat board index of the stone placed, 0 for a pass
+    captured: tuple[tuple[int, int], ...] #(index, player) of removed stones
+    turn: int #player who made the move
+    passes: int #consecutive passes before the move
+    game_over: bool #whether the game was over before the move
+    hash: int #Zobrist hash of the board after the move
+    keyframe: bytes | None #the board cells after the move, if kept
+    since_keyframe: int #placements since the latest keyframe
+    depth: int #number of entries before this one since the start of the
+               #game, counting any left out by trimmed
+
+    def __init__(self, parent: "HistoryNode | None", index: int,
+                 captured: tuple[tuple[int, int], ...], turn: int,
+                 passes: int, game_over: bool, position_hash: int,
+                 cells: bytes | bytearray | None = None):
+        """
+        Constructor
+
+        Args:
+            parent: the previous entry, None for the first one
+            index: flat board index of the stone placed, 0 for a pass
+            captured: (index, player) of every stone the move removed
+            turn: player who made the move
+            passes: consecutive passes before the move
+            game_over: whether the game was over before the move
+            position_hash: Zobrist hash of the board after the move
+            cells: the board cells after the move. Only needed for the
+            first entry and for placements; a copy is kept when the entry
+            is a keyframe.
+        """
+        self.parent = parent
+        self.index = index
+        self.captured = captured
+        self.turn = turn
+        self.passes = passes
+        self.game_over = game_over
+        self.hash = position_hash
+        self.keyframe = None
+        self.depth = 0 if parent is None else parent.depth + 1
+        if parent is None:
+            self.since_keyframe = 0
+        elif not index:
+            self.since_keyframe = parent.since_keyframe
+        else:
+            self.since_keyframe = parent.since_keyframe + 1
+        if parent is None or self.since_keyframe >= KEYFRAME_INTERVAL:
+            self.keyframe = bytes(cells)
+            self.since_keyframe = 0
+
+    @property
+    def is_state(self) -> bool:
+        """
+        Whether this entry changed the board (the first entry or a
+        placement), as opposed to a pass
+        """
+        return self.parent is None or self.index != 0
+
+    def latest_state(self) -> "HistoryNode":
+        """
+        Returns the latest entry at or before this one that changed the
+        board, skipping over passes
+        """
+        node = self
+        while not node.is_state:
+            node = node.parent
+        return node
+
+    def previous_state(self) -> "HistoryNode | None":
+        """
+        Returns the entry holding the board from before the latest
+        placement (the board the simple ko rule compares against), None if
+        there is no such entry
+        """
+        parent = self.latest_state().parent
+        return None if parent is None else parent.latest_state()
+
+    def states(self):
+        """
+        Iterates over every entry that changed the board, latest first
+        """
+        node = self.latest_state()
+        while True:
+            yield node
+            if node.parent is None:
+                return
+            node = node.parent.latest_state()
+
+    def cells(self) -> bytes:
+        """
+        Rebuilds the board cells after this entry by replaying the moves
+        since the nearest keyframe at or before it
+        """
+        replay = []
+        node = self
+        while node.keyframe is None:
+            replay.append(node)
+            node = node.parent
+        cells = bytearray(node.keyframe)
+        for node in reversed(replay):
+            if node.index:
+                cells[node.index] = node.turn
+                for stone, _ in node.captured:
+                    cells[stone] = EMPTY
+        return bytes(cells)
+
+    def trimmed(self, keep: int) -> "HistoryNode":
+        """
+        Returns a shorter history ending with the same entry: copies of the
+        latest keep entries, and of the entries before them back to a
+        placement, on top of a new first entry holding the board from
+        before them. The keep latest moves can then still be undone with
+        the board the simple ko rule compares against. The existing
+        entries are left unchanged, since other games may share them.
+
+        Inputs:
+            keep: the number of entries to keep after the first one
+
+        Returns (HistoryNode): the latest entry of the new history, or this
+            entry if there is nothing to leave out
+        """
+        entries = []
+        placed = False
+        node = self
+        while node.parent is not None and not placed:
+            entries.append(node)
+            placed = len(entries) > keep and node.index != 0
+            node = node.parent
+        if node.parent is None:
+            return self
+
+        entries.reverse()
+        first = entries[0]
+        cells = bytearray(node.cells())
+        trimmed = HistoryNode(None, 0, (), first.turn, first.passes,
+                              first.game_over, node.hash, cells)
+        trimmed.depth = node.depth
+        for entry in entries:
+            if entry.index:
+                cells[entry.index] = entry.turn
+                for stone, _ in entry.captured:
+                    cells[stone] = EMPTY
+            trimmed = HistoryNode(trimmed, entry.index, entry.captured,
+                                  entry.turn, entry.passes, entry.game_over,
+                                  entry.hash, cells)
+        return trimmed
@@ -0,0 +1,241 @@
+"""
+Monte Carlo Tree Search (UCT) strategy for the bot
+"""
+
+import math
+import random
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from go import Go
+
+# Weight of the exploration term in the UCT formula
+EXPLORATION = 1.4
+
+# Playouts run when neither a playout count nor a time budget is given
+DEFAULT_PLAYOUTS = 1000
+
+
+class Node:
+    """
+    A node of the search tree: the game after a sequence of moves from the
+    root, with the results of the playouts that went through it
+    """
+    __slots__ = ("parent", "move", "player", "children", "untried",
+                 "visits", "wins")
+
+    parent: "Node | None" #the node before the move, None for the root
+    move: tuple[int, int] | None #the move leading here, None for a pass
+    player: int #the player who made the move (0 for the root)
+    children: list["Node"] #the nodes of the moves tried so far
+    untried: list | None #the moves not tried yet, None until the node
+                         #is first expanded
+    visits: int #number of playouts through this node
+    wins: float #playouts won by player (ties split between the winners)
+
+    def __init__(self, parent: "Node | None", move: tuple[int, int] | None,
+                 player: int):
+        """
+        Constructor
+
+        Args:
+            parent: the node before the move, None for the root
+            move: the move leading to this node, None for a pass
+            player: the player who made the move (0 for the root)
+        """
+        self.parent = parent
+        self.move = move
+        self.player = player
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.wins = 0.0
+
+    def best_child(self) -> "Node":
+        """
+        Returns the child with the highest UCT value: its win rate plus an
+        exploration bonus for children visited less often
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits
+                   + EXPLORATION * math.sqrt(log_visits / child.visits))
+
+
+def tree_moves(game: Go) -> list:
+    """
+    Returns the moves to consider in the tree: the legal moves and a pass
+    (so that the search can choose to stop instead of filling its own
+    eyes), none if the game is over
+    """
+    if game.done:
+        return []
+    return game.moves(legal_only=True) + [None]
+
+def playout_move(game: Go, rng: random.Random) -> tuple[int, int] | None:
+    """
+    Picks a random legal move for a playout, leaving out suicides and the
+    player's own eyes (empty points whose neighbours are all the player's
+    stones), or None to pass if there is no such move
+    """
+    cells = game.cells
+    geo = game.geometry
+    neighbours = geo.neighbours
+    player = game.turn
+    empties = game.empties.tolist()
+    while empties:
+        # draw without replacement, stopping at the first good move
+        slot = rng.randrange(len(empties))
+        index = empties[slot]
+        empties[slot] = empties[-1]
+        empties.pop()
+        if all(cells[adjacent] == player for adjacent in neighbours[index]):
+            continue
+        move = geo.positions[index]
+        result = game.check_move(move)
+        if result is not None and not result.suicide:
+            return move
+    return None
+
+def playout(game: Go, rng: random.Random) -> dict[int, float]:
+    """
+    Plays random moves on the game, in place, until it is over (or has
+    gone on for four times as many moves as there are points)
+
+    Returns (dict): the reward of each player, 1 for a win and split
+        evenly between the players with the highest score
+    """
+    for _ in range(4 * game.size * game.size):
+        if game.done:
+            break
+        move = playout_move(game, rng)
+        if move is None:
+            game.pass_turn()
+        else:
+            game.apply_move(move)
+
+    scores = game.scores()
+    best = max(scores.values())
+    winners = [player for player, score in scores.items() if score == best]
+    return {player: 1 / len(winners) if player in winners else 0.0
+            for player in scores}
+
+def search(game: Go, playouts: int | None, time_ms: float | None,
+           rng: random.Random) -> Node:
+    """
+    Builds a search tree from the game. Each iteration walks down the tree
+    by UCT, adds a node for an untried move, plays the game out at random
+    from there and records the result along the path. The games are played
+    in place on a clone of the game, so no position is copied more than
+    once per playout.
+
+    Inputs:
+        game: the game to search from (it is not modified)
+        playouts: the number of playouts to run, None for no limit
+        time_ms: the time to spend in milliseconds, None for no limit (one
+        of the two limits must be given)
+        rng: the random number generator to use
+
+    Returns (Node): the root of the tree
+    """
+    deadline = None if time_ms is None else \
+        time.perf_counter() + time_ms / 1000
+
+    root = Node(None, None, 0)
+    root.untried = tree_moves(game)
+    rng.shuffle(root.untried)
+
+    done = 0
+    while playouts is None or done < playouts:
+        if deadline is not None and done and time.perf_counter() >= deadline:
+            break
+        done += 1
+        node = root
+        sim = game.clone()
+
+        while not node.untried and node.children:
+            node = node.best_child()
+            sim.play(node.move)
+
+        if node.untried:
+            move = node.untried.pop()
+            player = sim.turn
+            sim.play(move)
+            child = Node(node, move, player)
+            child.untried = tree_moves(sim)
+            rng.shuffle(child.untried)
+            node.children.append(child)
+            node = child
+
+        rewards = playout(sim, rng)
+        while node is not None:
+            node.visits += 1
+            if node.player:
+                node.wins += rewards[node.player]
+            node = node.parent
+
+    return root
+
+def search_worker(data: bytes, playouts: int | None, time_ms: float | None,
+                  seed: int) -> dict:
+    """
+    Runs search in a worker process, on a game packed with Go.to_bytes
+
+    Returns (dict): the number of visits of each move of the root
+    """
+    root = search(Go.from_bytes(data), playouts, time_ms, random.Random(seed))
+    return {child.move: child.visits for child in root.children}
+
+def mcts_move(game: Go, playouts: int | None = None,
+              time_ms: float | None = None,
+              rng: random.Random | None = None, jobs: int = 1,
+              pool: Executor | None = None) -> tuple[int, int] | None:
+    """
+    Chooses a move with Monte Carlo Tree Search (see search).
+
+    With several jobs, the search is root-parallel: each job grows its own
+    tree from the same root in a worker process, with its own random seed,
+    and the visits of the root moves are added up once they are all done.
+    The game is sent to the workers packed with Go.to_bytes.
+
+    Inputs:
+        game: the game to choose a move in (it is not modified)
+        playouts: the number of playouts to run, shared between the jobs
+        time_ms: the time to spend, in milliseconds. If both limits are
+        given, the search stops at the first one reached; if neither is,
+        DEFAULT_PLAYOUTS playouts are run.
+        rng: the random number generator to use, by default a new one
+        seeded from the random module
+        jobs: the number of trees to search in parallel
+        pool: the process pool to run the jobs on. If not given and jobs
+        is more than 1, a pool is started for this move only, so callers
+        choosing many moves should keep a pool of their own.
+
+    Returns: the most visited move, or None to pass
+    """
+    if rng is None:
+        rng = random.Random(random.getrandbits(64))
+    if playouts is None and time_ms is None:
+        playouts = DEFAULT_PLAYOUTS
+
+    moves = tree_moves(game)
+    if len(moves) < 2:
+        # nothing to choose between
+        return moves[0] if moves else None
+
+    if jobs <= 1:
+        root = search(game, playouts, time_ms, rng)
+        return max(root.children, key=lambda child: child.visits).move
+
+    share = None if playouts is None else -(-playouts // jobs)
+    arguments = ([game.to_bytes()] * jobs, [share] * jobs, [time_ms] * jobs,
+                 [rng.getrandbits(64) for _ in range(jobs)])
+    if pool is None:
+        with ProcessPoolExecutor(jobs) as own_pool:
+            results = list(own_pool.map(search_worker, *arguments))
+    else:
+        results = list(pool.map(search_worker, *arguments))
+
+    visits = {}
+    for result in results:
+        for move, count in result.items():
+            visits[move] = visits.get(move, 0) + count
+    return max(visits, key=visits.get)
@@ -0,0 +1,355 @@
+"""
+Alpha-beta minimax strategy for the bot
+"""
+
+import time
+from geometry import BORDER, EMPTY
+from go import Go
+from transposition import TranspositionTable
+
+# Depth searched when no time budget is given
+DEFAULT_DEPTH = 3
+
+# Depth at which iterative deepening stops even with time left
+MAX_DEPTH = 64
+
+# Number of killer moves remembered for each ply
+KILLERS = 2
+
+# Kinds of value kept in the transposition table: the exact value of the
+# position, or a bound on it when the search was cut off
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class OutOfTime(Exception):
+    """
+    Raised inside a search when its time budget runs out
+    """
+
+
+class Search:
+    """
+    Alpha-beta search from the position of a game, for the player to move
+    there. With more than two players, the others are all assumed to play
+    against that player, so a position is worth the player's score minus
+    the average score of the others.
+
+    A finished game is valued by its score. Any other position is valued
+    by an estimate of the score that is kept up to date as moves are
+    played, rather than computed for each position: every stone counts,
+    and so does every empty point whose neighbours are all the same
+    player's stones. A move only changes the count around the cells it
+    changed, so only those are counted again (see delta).
+
+    The moves are played and taken back on the game itself. They are
+    tried in the order most likely to cut the search short: the best move
+    found in the position before (kept in the transposition table), then
+    captures, then the killer moves of the ply (moves that cut off the
+    search of a sibling position), then the others by their history score
+    (how often and how deep they cut off the search anywhere in the tree).
+    Passes come last.
+    """
+    __slots__ = ("game", "player", "weights", "table", "deadline",
+                 "killers", "history", "nodes", "cut")
+
+    game: Go #the game searched, changed in place during the search
+    player: int #the player the positions are valued for
+    weights: list[float] #what a point of each cell value is worth to
+                         #the player (1 for the player's, minus a share of
+                         #1 for the others', 0 for EMPTY and BORDER)
+    table: TranspositionTable | None #values of the positions searched
+    deadline: float | None #time.perf_counter() value to stop at, if any
+    killers: list[list[tuple[int, int]]] #the killer moves of each ply
+    history: dict[tuple[int, int], int] #the history score of each move
+    nodes: int #number of positions visited
+    cut: bool #whether a position was valued before the game was over
+
+    def __init__(self, game: Go, table: TranspositionTable | None = None,
+                 deadline: float | None = None):
+        """
+        Constructor
+
+        Args:
+            game: the game to search (it is changed during the search, but
+            restored after each completed one)
+            table: the transposition table to use, if any. It should only
+            be shared by searches for the same player.
+            deadline: time.perf_counter() value at which the search raises
+            OutOfTime, None for no limit
+        """
+        self.game = game
+        self.player = game.turn
+        self.weights = [0.0] * (BORDER + 1)
+        for other in range(1, game.num_players + 1):
+            self.weights[other] = -1 / (game.num_players - 1)
+        self.weights[game.turn] = 1.0
+        self.table = table
+        self.deadline = deadline
+        self.killers = []
+        self.history = {}
+        self.nodes = 0
+        self.cut = False
+
+    def score(self) -> float:
+        """
+        Returns the value of the current position from the scores of the
+        game (the stone counts and the territory the board keeps)
+        """
+        stones = self.game.stone_counts
+        territory = self.game.territory_counts()
+        return sum(weight * (stones[player] + territory[player])
+                   for player, weight in enumerate(self.weights)
+                   if weight)
+
+    def estimate(self, cells: bytes | bytearray, area) -> float:
+        """
+        Returns what the points in area add to the estimated value of a
+        board (see the class description)
+
+        Inputs:
+            cells: the flat board
+            area: indices of the points to count
+        """
+        weights = self.weights
+        neighbours = self.game.geometry.neighbours
+        total = 0.0
+        for index in area:
+            cell = cells[index]
+            if cell != EMPTY:
+                total += weights[cell]
+                continue
+            owner = BORDER
+            for adjacent in neighbours[index]:
+                other = cells[adjacent]
+                if other == BORDER:
+                    continue
+                if other == EMPTY or owner not in (BORDER, other):
+                    break
+                owner = other
+            else:
+                total += weights[owner]
+        return total
+
+    def delta(self) -> float:
+        """
+        Returns how much the latest move changed the estimated value, by
+        counting the points around the cells it changed before and after
+        """
+        index, captured = self.game.last_move
+        if not index:
+            return 0.0
+        cells = self.game.cells
+        before = bytearray(cells)
+        before[index] = EMPTY
+        for stone, player in captured:
+            if stone != index:
+                before[stone] = player
+        neighbours = self.game.geometry.neighbours
+        area = {index}
+        for stone, _ in captured:
+            area.add(stone)
+        for index in list(area):
+            area.update(neighbours[index])
+        return self.estimate(cells, area) - self.estimate(before, area)
+
+    def moves(self, ply: int, hint: tuple[int, int] | None = None) -> list:
+        """
+        Returns the moves to search in the current position, best first:
+        the legal moves (leaving out suicides and the player's own eyes,
+        empty points whose neighbours are all the player's stones) and a
+        pass, none if the game is over
+
+        Inputs:
+            ply: the number of moves played since the start of the search
+            hint: the best move found in this position by an earlier search
+        """
+        game = self.game
+        if game.done:
+            return []
+        cells = game.cells
+        geo = game.geometry
+        neighbours = geo.neighbours
+        player = game.turn
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history
+
+        ranked = []
+        # the ko checks place stones, so the empty points are copied first
+        for index in game.empties.tolist():
+            if all(cells[adjacent] == player
+                   for adjacent in neighbours[index]):
+                continue
+            move = geo.positions[index]
+            result = game.check_move(move)
+            if result is None or result.suicide:
+                continue
+            ranked.append(((move == hint, bool(result.captured),
+                            move in killers, history.get(move, 0)), move))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in ranked] + [None]
+
+    def cutoff(self, move: tuple[int, int] | None, depth: int,
+               ply: int) -> None:
+        """
+        Records that a move cut off the search of a position, as a killer
+        move of the ply and in the history scores
+        """
+        if move is None:
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLERS:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    def alpha_beta(self, depth: int, ply: int, alpha: float, beta: float,
+                   value: float) -> float:
+        """
+        Values the current position by searching depth moves ahead. The
+        player maximizes the value and the others minimize it.
+
+        Inputs:
+            depth: the number of moves to search ahead
+            ply: the number of moves played since the start of the search
+            alpha: the value the player is already sure of elsewhere
+            beta: the value the others are already sure of elsewhere
+            value: the estimated value of the position
+
+        Returns: the value of the position if it is between alpha and
+            beta, otherwise a bound on it beyond that side of the window
+
+        Raises: OutOfTime if the deadline has passed
+        """
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise OutOfTime
+        game = self.game
+        if game.done:
+            return self.score()
+        if depth == 0:
+            self.cut = True
+            return value
+
+        table = self.table
+        window = (alpha, beta)
+        hint = None
+        if table is not None:
+            key = table.key(game)
+            entry = table.lookup(key)
+            if entry is not None:
+                stored, bound, hint = entry.value
+                if entry.depth >= depth:
+                    # the entry may come from a search cut short anywhere
+                    self.cut = True
+                    if bound == EXACT:
+                        return stored
+                    if bound == LOWER:
+                        alpha = max(alpha, stored)
+                    else:
+                        beta = min(beta, stored)
+                    if alpha >= beta:
+                        return stored
+
+        maximizing = game.turn == self.player
+        best = float('-inf') if maximizing else float('inf')
+        best_move = None
+        for move in self.moves(ply, hint):
+            game.play(move)
+            result = self.alpha_beta(depth - 1, ply + 1, alpha, beta,
+                                     value + self.delta())
+            game.undo()
+            if maximizing:
+                if result > best:
+                    best, best_move = result, move
+                alpha = max(alpha, result)
+            else:
+                if result < best:
+                    best, best_move = result, move
+                beta = min(beta, result)
+            if alpha >= beta:
+                self.cutoff(move, depth, ply)
+                break
+
+        if table is not None:
+            if best <= window[0]:
+                bound = UPPER
+            elif best >= window[1]:
+                bound = LOWER
+            else:
+                bound = EXACT
+            table.store(key, (best, bound, best_move), depth)
+        return best
+
+    def search_root(self, depth: int,
+                    moves: list) -> tuple[float, tuple[int, int] | None]:
+        """
+        Searches each move of the current position depth moves ahead, in
+        the order given
+
+        Returns (tuple): the best value and the first move reaching it
+
+        Raises: OutOfTime if the deadline has passed
+        """
+        game = self.game
+        value = self.estimate(game.cells, game.geometry.points)
+        alpha = float('-inf')
+        best_move = moves[0]
+        for move in moves:
+            game.play(move)
+            result = self.alpha_beta(depth - 1, 1, alpha, float('inf'),
+                                     value + self.delta())
+            game.undo()
+            if result > alpha:
+                alpha, best_move = result, move
+        return alpha, best_move
+
+def minimax_move(game: Go, time_ms: float | None = None,
+                 max_depth: int | None = None,
+                 table: TranspositionTable | None = None
+                 ) -> tuple[int, int] | None:
+    """
+    Chooses a move with alpha-beta search (see Search), deepening it one
+    move at a time. Each search starts from the best move of the one
+    before, and deepening stops when the time runs out (the move of the
+    last completed search is kept), at max_depth, or when the search
+    reached the end of the game everywhere.
+
+    Inputs:
+        game: the game to choose a move in (it is not modified)
+        time_ms: the time to spend, in milliseconds, None for no limit.
+        If neither limit is given, the search goes DEFAULT_DEPTH moves
+        ahead.
+        max_depth: the number of moves to search ahead, None for no limit
+        table: the transposition table to use, by default a new one for
+        this move only. A table kept across moves should only be used
+        for the same player.
+
+    Returns: the best move found, or None to pass
+    """
+    if time_ms is None and max_depth is None:
+        max_depth = DEFAULT_DEPTH
+    deadline = None if time_ms is None else \
+        time.perf_counter() + time_ms / 1000
+    if table is None:
+        table = TranspositionTable()
+
+    search = Search(game.clone(), table, deadline)
+    moves = search.moves(0)
+    if len(moves) < 2:
+        # nothing to choose between
+        return moves[0] if moves else None
+
+    best = moves[0]
+    for depth in range(1, (max_depth or MAX_DEPTH) + 1):
+        search.cut = False
+        try:
+            _, best = search.search_root(depth, moves)
+        except OutOfTime:
+            break
+        moves.remove(best)
+        moves.insert(0, best)
+        if not search.cut:
+            break
+    return best
@@ -0,0 +1,411 @@
+"""
+For NumpyGo(SnapshotGo), a Go engine storing the board as a NumPy array, and
+GoBatch, which plays many games at once in lockstep
+"""
+import numpy as np
+
+from base import BoardGridType, ListMovesType
+from snapshot import SnapshotGo
+
+
+def dilate(mask: np.ndarray) -> np.ndarray:
+    """
+    Returns the mask of every square adjacent to a set square of mask. The
+    board is made of the last two axes, so mask may also hold a batch of
+    boards.
+    """
+    around = np.zeros_like(mask)
+    around[..., 1:, :] |= mask[..., :-1, :]
+    around[..., :-1, :] |= mask[..., 1:, :]
+    around[..., :, 1:] |= mask[..., :, :-1]
+    around[..., :, :-1] |= mask[..., :, 1:]
+    return around
+
+
+def label_groups(board: np.ndarray) -> np.ndarray:
+    """
+    Labels the connected groups of equal squares of a board (chains of
+    stones and empty regions alike). The board is made of the last two
+    axes, so board may also hold a batch of boards.
+
+    Returns: an array of the same shape as board where every square holds
+        the flat index (into the whole array) of one square of its group,
+        the same for every square of the group
+    """
+    outside = board.size
+    labels = np.arange(outside).reshape(board.shape)
+    same_rows = board[..., 1:, :] == board[..., :-1, :]
+    same_cols = board[..., :, 1:] == board[..., :, :-1]
+    while True:
+        new = labels.copy()
+        np.minimum(new[..., 1:, :], np.where(same_rows, labels[..., :-1, :],
+                                             outside), out=new[..., 1:, :])
+        np.minimum(new[..., :-1, :], np.where(same_rows, labels[..., 1:, :],
+                                              outside), out=new[..., :-1, :])
+        np.minimum(new[..., :, 1:], np.where(same_cols, labels[..., :, :-1],
+                                             outside), out=new[..., :, 1:])
+        np.minimum(new[..., :, :-1], np.where(same_cols, labels[..., :, 1:],
+                                              outside), out=new[..., :, :-1])
+        # every label is a square of the same group, so jump to its label
+        new = new.ravel()[new]
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+class NumpyGo(SnapshotGo):
+    """
+    Go engine that stores the board as an int8 array of shape (side, side),
+    holding 0 for an empty square and the player number otherwise.
+
+    Nothing loops over the squares in Python: neighbours are found by
+    shifting boolean masks, and chains and empty regions are found with
+    label propagation, where every square starts with its own flat index as
+    label and repeatedly takes the smallest label of its neighbours of the
+    same colour. Captures, liberties and territory are then all computed
+    from the labels with array operations.
+    """
+    __slots__ = ("_board",)
+
+    _board: np.ndarray #the stones on the board, 0 for an empty square
+
+    def __init__(self, side: int, players: int, superko: bool = False):
+        super().__init__(side, players, superko)
+        self._board = np.zeros((side, side), dtype=np.int8)
+        self._start()
+
+    @property
+    def grid(self) -> BoardGridType:
+        return [[piece or None for piece in row]
+                for row in self._board.tolist()]
+
+    @property
+    def available_moves(self) -> ListMovesType:
+        if self._game_over:
+            return []
+        return [(row + 1, col + 1)
+                for row, col in np.argwhere(self._board == 0).tolist()]
+
+    def piece_at(self, pos: tuple[int, int]) -> int | None:
+        row, col = self._square(pos)
+        return int(self._board[row, col]) or None
+
+    def scores(self) -> dict[int, int]:
+        board = self._board
+        stones = np.bincount(board.ravel(), minlength=self._players + 1)
+
+        # touches[player, label] is set when the empty region with that
+        # label borders a stone of player
+        empty = board == 0
+        labels = label_groups(board)
+        touches = np.zeros((self._players + 1, board.size), dtype=bool)
+        for player in range(1, self._players + 1):
+            touches[player, labels[dilate(board == player) & empty]] = True
+        owned = touches.sum(axis=0) == 1
+
+        empty_labels = labels[empty]
+        single = owned[empty_labels]
+        return {player: int(stones[player]) + int(np.count_nonzero(
+                    touches[player, empty_labels] & single))
+                for player in range(1, self._players + 1)}
+
+    def _snapshot(self) -> bytes:
+        return self._board.tobytes()
+
+    def _placed(self, pos: tuple[int, int]) -> bytes:
+        return self._result(*self._square(pos), self._turn).tobytes()
+
+    def _play(self, pos: tuple[int, int]) -> None:
+        self._board = self._result(*self._square(pos), self._turn)
+        self._record()
+
+    def _load(self, grid: BoardGridType) -> None:
+        self._board = np.array([[player or 0 for player in row]
+                                for row in grid], dtype=np.int8)
+
+    def _copy(self) -> "NumpyGo":
+        game = super()._copy()
+        game._board = self._board.copy()
+        return game
+
+    def _square(self, pos: tuple[int, int]) -> tuple[int, int]:
+        """
+        Returns the (row, col) array index of a position
+
+        Raises: ValueError if the position is not on the board
+        """
+        row, col = pos
+        if not (1 <= row <= self._side and 1 <= col <= self._side):
+            raise ValueError(f"Position {pos} is out of bounds")
+        return row - 1, col - 1
+
+    def _result(self, row: int, col: int, player: int) -> np.ndarray:
+        """
+        Computes the board after player places a stone on a square (a stone
+        already there is replaced), without changing the game
+
+        Opponent chains next to the new stone that are left without
+        liberties are captured first; if the new stone's chain still has no
+        liberties afterwards, it is removed too.
+        """
+        board = self._board.copy()
+        board[row, col] = player
+        labels = label_groups(board)
+
+        # labels of the chains with at least one liberty
+        alive = np.zeros(board.size, dtype=bool)
+        alive[labels[(board != 0) & dilate(board == 0)]] = True
+
+        dead = []
+        for r, c in ((row - 1, col), (row + 1, col),
+                     (row, col - 1), (row, col + 1)):
+            if 0 <= r < self._side and 0 <= c < self._side and \
+                board[r, c] not in (0, player) and not alive[labels[r, c]]:
+                dead.append(labels[r, c])
+        if dead:
+            board[np.isin(labels, dead)] = 0
+
+        own = labels == labels[row, col]
+        if not (dilate(own) & (board == 0)).any():
+            board[own] = 0
+        return board
+
+
+def spread(mask: np.ndarray, width: int) -> np.ndarray:
+    """
+    Returns mask together with every square adjacent to one of its set
+    squares, for boards stored row by row in the last axis with rows of
+    the given width. Each board must be surrounded by guard squares, so
+    that a shift can never reach the squares of another row or board.
+    """
+    flat = mask.reshape(-1)
+    around = flat.copy()
+    around[1:] |= flat[:-1]
+    around[:-1] |= flat[1:]
+    around[width:] |= flat[:-width]
+    around[:-width] |= flat[width:]
+    return around.reshape(mask.shape)
+
+
+class GoBatch:
+    """
+    Plays many games of Go at once, in lockstep: every call to step makes
+    one move (or pass) in each game that is not over yet.
+
+    The boards are held in one int8 array with a row per game, and
+    captures, ko checks, pass counters and scores are worked out for every
+    game at once with array operations. Each board is stored row by row
+    with a guard column on the right and a guard row above and below
+    (holding GUARD), so that moving a mask by one square in any direction
+    is a single shift of the whole array. Moves are given as flat square
+    indices, row * side + col (counting from 0), or -1 for a pass. Only the
+    simple ko rule is supported.
+    """
+    __slots__ = ("_side", "_width", "_squares", "_players", "_boards",
+                 "_previous", "_has_previous", "_turn", "_passes", "_rng")
+
+    GUARD = -1
+
+    _side: int #the side of every board
+    _width: int #the length of a stored row, including the guard column
+    _squares: np.ndarray #the stored index of each square, in row-major order
+    _players: int #the number of players in every game
+    _boards: np.ndarray #the stored board of each game, 0 for an empty square
+    _previous: np.ndarray #each board from before its latest placement
+    _has_previous: np.ndarray #whether each game has had a placement
+    _turn: np.ndarray #the player whose turn it is in each game
+    _passes: np.ndarray #the number of consecutive passes in each game
+    _rng: np.random.Generator #source of the random moves
+
+    def __init__(self, games: int, side: int, players: int,
+                 seed: int | None = None):
+        """
+        Constructor
+
+        Args:
+            games: number of games to play at once
+            side: the side of every board
+            players: the number of players in every game
+            seed: seed for random_moves, or None for a random seed
+
+        Raises: ValueError if there are no games or too many players
+        """
+        if games < 1:
+            raise ValueError("A batch needs at least one game")
+        if not 1 <= players <= 127:
+            raise ValueError(f"Cannot play with {players} players")
+        self._side = side
+        self._width = side + 1
+        rows, cols = np.divmod(np.arange(side * side), side)
+        self._squares = (rows + 1) * self._width + cols
+        self._players = players
+
+        board = np.full((side + 2) * self._width, self.GUARD, dtype=np.int8)
+        board[self._squares] = 0
+        self._boards = np.tile(board, (games, 1))
+        self._previous = self._boards.copy()
+        self._has_previous = np.zeros(games, dtype=bool)
+        self._turn = np.ones(games, dtype=np.int8)
+        self._passes = np.zeros(games, dtype=np.int64)
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def games(self) -> int:
+        """
+        Returns the number of games in the batch
+        """
+        return len(self._boards)
+
+    @property
+    def boards(self) -> np.ndarray:
+        """
+        Returns a copy of the boards, of shape (games, side, side)
+        """
+        return self._boards[:, self._squares].reshape(
+            self.games, self._side, self._side)
+
+    @property
+    def turn(self) -> np.ndarray:
+        """
+        Returns the player whose turn it is in each game
+        """
+        return self._turn.copy()
+
+    @property
+    def done(self) -> np.ndarray:
+        """
+        Returns whether each game is over
+        """
+        return self._passes >= self._players
+
+    def random_moves(self) -> np.ndarray:
+        """
+        Picks a random empty square in each game, or a pass (-1) in games
+        without any empty square
+        """
+        keys = self._rng.random((self.games, self._side * self._side),
+                                dtype=np.float32)
+        keys[self._boards[:, self._squares] != 0] = -1
+        moves = keys.argmax(axis=1)
+        moves[keys.max(axis=1) < 0] = -1
+        return moves
+
+    def step(self, moves: np.ndarray) -> np.ndarray:
+        """
+        Makes one move in each game that is not over yet. As with
+        GoBase.apply_move, a move on an occupied square or breaking the ko
+        rule is ignored, and the same player is still to play.
+
+        Inputs:
+            moves: the flat square index (or -1 for a pass) to play in each
+            game
+
+        Returns: whether the move was made in each game
+        """
+        moves = np.asarray(moves)
+        active = ~self.done
+        passing = active & (moves < 0)
+        played = passing.copy()
+
+        points = self._squares[np.maximum(moves, 0)]
+        placing = active & (moves >= 0) & \
+            (self._boards[np.arange(self.games), points] == 0)
+        idx = np.flatnonzero(placing)
+        if len(idx):
+            legal, boards = self._results(idx, points[idx])
+            idx = idx[legal]
+            self._previous[idx] = self._boards[idx]
+            self._has_previous[idx] = True
+            self._boards[idx] = boards[legal]
+            self._passes[idx] = 0
+            played[idx] = True
+
+        self._passes[passing] += 1
+        self._turn[played] = self._turn[played] % self._players + 1
+        return played
+
+    def scores(self) -> np.ndarray:
+        """
+        Computes the score of each player in each game (the stones plus
+        the empty squares only bordering that player's stones)
+
+        Returns: an array of shape (games, players), where column p - 1
+            holds the scores of player p
+        """
+        boards = self.boards
+        empty = boards == 0
+        labels = label_groups(boards)
+
+        # touches[player - 1, label] is set when the empty region with that
+        # label borders a stone of player
+        touches = np.zeros((self._players, boards.size), dtype=bool)
+        for player in range(1, self._players + 1):
+            touches[player - 1, labels[dilate(boards == player) & empty]] = True
+        owned = empty & (touches.sum(axis=0) == 1)[labels]
+
+        scores = np.zeros((self.games, self._players), dtype=np.int64)
+        for player in range(1, self._players + 1):
+            scores[:, player - 1] = np.count_nonzero(
+                (boards == player) | (owned & touches[player - 1][labels]),
+                axis=(1, 2))
+        return scores
+
+    def _results(self, idx: np.ndarray,
+                 points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the boards after the player to move in each game of idx
+        places a stone on an empty stored square, without changing the games
+
+        Opponent chains next to the new stone that are left without
+        liberties are captured first; if the new stone's chain still has no
+        liberties afterwards, it is removed too.
+
+        Returns: whether each move is legal under the ko rule, and the
+            resulting stored boards
+        """
+        games = np.arange(len(idx))
+        players = self._turn[idx]
+        boards = self._boards[idx]
+        boards[games, points] = players
+
+        # chains[0:4] grow from the neighbours of the new stone and
+        # chains[4] from the stone itself, all at once. A chain stops
+        # growing as soon as it reaches a liberty, since it then survives.
+        steps = (-self._width, self._width, -1, 1, 0)
+        chains = np.zeros((len(steps), len(idx), boards.shape[1]), dtype=bool)
+        colours = np.zeros((len(steps), len(idx)), dtype=np.int8)
+        for seed, step in enumerate(steps):
+            colours[seed] = boards[games, points + step]
+            chains[seed, games, points + step] = True
+        opponents = (colours[:4] > 0) & (colours[:4] != players)
+
+        chains = chains.reshape(len(steps) * len(idx), -1)
+        colours = colours.reshape(-1)
+        owners = np.tile(games, len(steps))
+        alive = np.zeros(len(chains), dtype=bool)
+        growing = np.flatnonzero(np.concatenate(
+            (opponents.reshape(-1), np.ones(len(idx), dtype=bool))))
+        while len(growing):
+            chain = chains[growing]
+            board = boards[owners[growing]]
+            around = spread(chain, self._width)
+            free = (around & (board == 0)).any(axis=1)
+            grown = around & (board == colours[growing, None])
+            alive[growing] = free
+            chains[growing] = grown
+            growing = growing[~free & (grown != chain).any(axis=1)]
+        chains = chains.reshape(len(steps), len(idx), -1)
+        alive = alive.reshape(len(steps), len(idx))
+
+        captured = opponents & ~alive[:4]
+        if captured.any():
+            boards[(chains[:4] & captured[..., None]).any(axis=0)] = 0
+
+        own = chains[4]
+        suicide = ~alive[4] & \
+            ~(spread(own, self._width) & (boards == 0)).any(axis=1)
+        boards[own & suicide[:, None]] = 0
+
+        ko = self._has_previous[idx] & \
+            (boards == self._previous[idx]).all(axis=1)
+        return ~ko, boards
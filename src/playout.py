@@ -0,0 +1,141 @@
+"""
+Light playout engine: fast random games on a bare flat board
+"""
+
+import random
+from geometry import EMPTY, geometry
+from go import Go, zobrist_keys
+
+
+def random_playout(side: int, max_moves: int, players: int = 2,
+                   rng: random.Random | None = None,
+                   moves: list | None = None) -> tuple[Go, int]:
+    """
+    Plays a random game like the 'random' strategy of bot.simulated_game:
+    each move picks a random empty point (a pass when there is none), a
+    move breaking the ko rule is not played and the same player picks
+    again, and the game stops when it is over or after max_moves moves.
+
+    The game is played on a bare flat board (laid out like go.Board, with
+    a border) with no chains and no history. The empty points are kept in
+    a list, updated as stones are placed and captured, so a move is picked
+    without scanning the board. Captures are found by a flood fill from
+    the new stone's neighbours that stops at the first liberty. Only the
+    board from before the latest placement is kept, for the simple ko
+    rule, and it is only compared when the Zobrist hashes match.
+
+    Inputs:
+        side: length of the board
+        max_moves: the number of moves (including passes and moves that
+        were not played) after which the game is stopped
+        players: number of players
+        rng: the random number generator to use, the random module's
+        functions by default
+        moves: if given, the moves played are appended to it, in order:
+        the (row, col) position of each placement, None for each pass
+
+    Returns (tuple): a Go game showing the final board, turn and passes
+        (without the history of the moves), and the move count
+    """
+    randrange = random.randrange if rng is None else rng.randrange
+    geo = geometry(side)
+    neighbours = geo.neighbours
+    cells = bytearray(geo.cells)
+    keys = [None] + [zobrist_keys(len(cells), player)
+                     for player in range(1, players + 1)]
+    empties = list(geo.points)
+    slots = [0] * len(cells)
+    for slot, index in enumerate(empties):
+        slots[index] = slot
+
+    def dead_chain(start: int, checked: set[int]) -> list[int] | None:
+        """
+        Returns the stones of the chain at start if it has no liberties,
+        None otherwise. The stones looked at are added to checked: a
+        flood fill reaching a checked stone has reached a chain already
+        found to have a liberty, so a chain is only filled once per move.
+        """
+        for adjacent in neighbours[start]:
+            if cells[adjacent] == EMPTY:
+                checked.add(start)
+                return None
+        owner = cells[start]
+        stones = [start]
+        chain = {start}
+        for stone in stones:
+            for adjacent in neighbours[stone]:
+                cell = cells[adjacent]
+                if cell == EMPTY or (cell == owner and adjacent in checked):
+                    checked.update(chain)
+                    return None
+                if cell == owner and adjacent not in chain:
+                    chain.add(adjacent)
+                    stones.append(adjacent)
+        checked.update(chain)
+        return stones
+
+    turn = 1
+    passes = 0
+    move_count = 0
+    position_hash = 0
+    before = None # the board from before the latest placement
+    before_hash = None
+
+    while move_count < max_moves and passes < players:
+        move_count += 1
+        if not empties:
+            passes += 1
+            turn = turn % players + 1
+            if moves is not None:
+                moves.append(None)
+            continue
+
+        index = empties[randrange(len(empties))]
+        snapshot = bytes(cells)
+        cells[index] = turn
+        new_hash = position_hash ^ keys[turn][index]
+
+        # decide which chains are dead before removing any of them
+        removed = []
+        checked = set()
+        for adjacent in neighbours[index]:
+            cell = cells[adjacent]
+            if cell != EMPTY and cell != turn and adjacent not in checked:
+                removed.extend(dead_chain(adjacent, checked) or ())
+        if not removed:
+            removed = dead_chain(index, checked) or []
+        for stone in removed:
+            new_hash ^= keys[cells[stone]][stone]
+            cells[stone] = EMPTY
+
+        if new_hash == before_hash and cells == before:
+            # breaks the ko rule: the move is not played
+            cells[:] = snapshot
+            continue
+
+        before = snapshot
+        before_hash = position_hash
+        position_hash = new_hash
+        if cells[index] != EMPTY:
+            last = empties.pop()
+            if last != index:
+                empties[slots[index]] = last
+                slots[last] = slots[index]
+        for stone in removed:
+            if stone != index:
+                slots[stone] = len(empties)
+                empties.append(stone)
+        passes = 0
+        turn = turn % players + 1
+        if moves is not None:
+            moves.append(geo.positions[index])
+
+    # give the final turn and passes back to the game by replaying the
+    # passes from the player who made the first of them
+    game = Go(side, players)
+    game.load_game((turn - passes - 1) % players + 1, [
+        [cells[row * geo.stride + col] or None for col in range(1, side + 1)]
+        for row in range(1, side + 1)])
+    for _ in range(passes):
+        game.pass_turn()
+    return game, move_count
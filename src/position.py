@@ -0,0 +1,356 @@
+"""
+For Position, an immutable and hashable Go position for tree search
+"""
+from functools import lru_cache
+from base import GoBase, BoardGridType, ListMovesType
+from geometry import BORDER, geometry
+from go import Board, Go
+
+# The cells separating two rows of a flat board: the right border of one
+# and the left border of the next
+ROW_BORDER = bytes([BORDER, BORDER])
+
+
+class Position:
+    """
+    Immutable snapshot of a game of Go: the board, the player to move, the
+    number of consecutive passes and a reference to the positions before
+    it (for the ko and superko rules).
+
+    The board is a tuple with one bytes object per row (0 for an empty
+    square, otherwise the player number). Playing a move creates a new
+    Position that reuses every row the move did not change, so a search
+    tree holding many positions only stores the rows that differ.
+
+    Only the storage is kept here: the rules (captures, suicide and
+    scoring) are those of go.Board, applied to a board loaded with the
+    position's stones when a move or the score is worked out.
+
+    Positions are never modified once created, and two positions are equal
+    (with equal hashes) when they have the same rules, board, player to
+    move and pass count, and the same ko. A single move can only bring back
+    the board from before the latest placement when that placement was a
+    lone stone taking at most one stone, or a suicide removing at most one
+    other stone, so the earlier board only counts in those cases (and only
+    when the player to move could do it). Under the superko rule, the rest
+    of the history is not part of the comparison.
+    """
+    __slots__ = ("_side", "_players", "_superko", "_rows", "_turn",
+                 "_passes", "_hash", "_parent", "_before", "_ko")
+
+    _side: int #number of squares on each side of the board
+    _players: int #number of players
+    _superko: bool #whether the superko rule is in effect
+    _rows: tuple[bytes, ...] #the board, one bytes object per row
+    _turn: int #the player whose turn it is
+    _passes: int #the number of consecutive passes
+    _hash: int #Zobrist hash of the stones on the board
+    _parent: "Position | None" #the position before the latest move
+    _before: "Position | None" #the position before the latest placement
+    _ko: int | None #the player who could bring back the board from before
+                    #the latest placement in one move (0 if any player
+                    #could), None if no move can
+
+    def __init__(self, side: int, players: int, superko: bool = False):
+        """
+        Constructor, for the starting position of a game
+
+        Args:
+            side: Number of squares on each side of the board
+            players: Number of players
+            superko: If True, the superko rule is in effect, otherwise the
+            simple ko rule is
+        """
+        self._side = side
+        self._players = players
+        self._superko = superko
+        self._rows = (bytes(side),) * side
+        self._turn = 1
+        self._passes = 0
+        self._hash = 0
+        self._parent = None
+        self._before = None
+        self._ko = None
+
+    @classmethod
+    def from_grid(cls, grid: BoardGridType, turn: int, players: int,
+                  superko: bool = False) -> "Position":
+        """
+        Creates a position from a grid, as returned by GoBase.grid and
+        accepted by GoBase.load_game. Like load_game, the position starts
+        without any history.
+
+        Args:
+            grid: the state of the board as a list of lists
+            turn: the player who would make the next move
+            players: number of players
+            superko: whether the superko rule is in effect
+
+        Raises:
+            ValueError: if the turn or any piece is not a valid player, or
+            if the grid is not square
+        """
+        side = len(grid)
+        if not 1 <= turn <= players:
+            raise ValueError(f"Turn {turn} is not a valid player")
+        if any(len(row) != side for row in grid):
+            raise ValueError("Grid is not square")
+        for row in grid:
+            for player in row:
+                if player is not None and not 1 <= player <= players:
+                    raise ValueError(f"Grid contains invalid player {player}")
+
+        position = cls(side, players, superko)
+        position._rows = tuple(bytes(player or 0 for player in row)
+                               for row in grid)
+        position._hash = load_board(side, position._rows).hash
+        position._turn = turn
+        return position
+
+    @classmethod
+    def from_game(cls, game: GoBase) -> "Position":
+        """
+        Creates a position from the board and turn of a game, without its
+        history (see from_grid)
+        """
+        return cls.from_grid(game.grid, game.turn, game.num_players,
+                             game._superko)  # pylint: disable=protected-access
+
+    def to_game(self) -> Go:
+        """
+        Creates a Go game showing this position, through load_game. The
+        game starts without any history or passes.
+        """
+        game = Go(self._side, self._players, self._superko)
+        game.load_game(self._turn, self.grid)
+        return game
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the size of the board (the number of squares per side)
+        """
+        return self._side
+
+    @property
+    def num_players(self) -> int:
+        """
+        Returns the number of players
+        """
+        return self._players
+
+    @property
+    def grid(self) -> BoardGridType:
+        """
+        Returns the board as a list of lists, like GoBase.grid
+        """
+        return [[player or None for player in row] for row in self._rows]
+
+    @property
+    def turn(self) -> int:
+        """
+        Returns the player whose turn it is
+        """
+        return self._turn
+
+    @property
+    def passes(self) -> int:
+        """
+        Returns the number of consecutive passes
+        """
+        return self._passes
+
+    @property
+    def position_hash(self) -> int:
+        """
+        Zobrist hash of the stones on the board (the same as
+        Go.position_hash for the same board)
+        """
+        return self._hash
+
+    @property
+    def done(self) -> bool:
+        """
+        Returns True if every player has passed in a row, False otherwise
+        """
+        return self._passes >= self._players
+
+    @property
+    def available_moves(self) -> ListMovesType:
+        """
+        Returns the empty positions, like GoBase.available_moves
+        """
+        if self.done:
+            return []
+        return [(row + 1, col + 1) for row, cells in enumerate(self._rows)
+                for col, player in enumerate(cells) if not player]
+
+    def piece_at(self, pos: tuple[int, int]) -> int | None:
+        """
+        Returns the player with a piece at a position, None if it is empty
+
+        Raises: ValueError if the position is not on the board
+        """
+        geometry(self._side).index(pos)
+        return self._rows[pos[0] - 1][pos[1] - 1] or None
+
+    def legal_move(self, pos: tuple[int, int]) -> bool:
+        """
+        Checks if the player to move could place a piece at a position
+
+        Raises: ValueError if the position is not on the board
+        """
+        if self.piece_at(pos) is not None or self.done:
+            return False
+        board = load_board(self._side, self._rows)
+        new_hash = board.predict(geometry(self._side).index(pos),
+                                 self._turn)[0]
+        if not self._repeats(None, new_hash):
+            return True
+        rows, new_hash, _ = self._result(pos)
+        return not self._repeats(rows, new_hash)
+
+    def play(self, pos: tuple[int, int] | None) -> "Position":
+        """
+        Returns the position after the player to move places a piece at a
+        position (resolving captures), or passes
+
+        Inputs:
+            pos: a board position (row, col), or None for a pass
+
+        Raises: ValueError if the position is not on the board, or if the
+            move is not legal
+        """
+        position = Position.__new__(Position)
+        position._side = self._side
+        position._players = self._players
+        position._superko = self._superko
+        position._turn = self._turn % self._players + 1
+        position._parent = self
+
+        if pos is None:
+            position._rows = self._rows
+            position._passes = self._passes + 1
+            position._hash = self._hash
+            position._before = self._before
+            position._ko = self._ko
+            return position
+
+        if self.piece_at(pos) is not None or self.done:
+            raise ValueError(f"Position {pos} is not a legal move")
+        rows, new_hash, ko = self._result(pos)
+        if self._repeats(rows, new_hash):
+            raise ValueError(f"Position {pos} breaks the ko rule")
+        position._rows = rows
+        position._passes = 0
+        position._hash = new_hash
+        position._before = self
+        position._ko = ko
+        return position
+
+    def scores(self) -> dict[int, int]:
+        """
+        Computes the score of each player like Go.scores: their stones plus
+        the empty squares in regions bordered only by their stones
+        """
+        return load_board(self._side, self._rows).scores(self._players)
+
+    def _ko_possible(self) -> bool:
+        """
+        Returns whether a move of the player to move could bring back the
+        board from before the latest placement
+        """
+        return self._ko in (0, self._turn)
+
+    def _key(self) -> tuple:
+        """
+        Returns the values two equal positions share
+        """
+        before = self._before._rows if self._ko_possible() else None
+        return (self._players, self._superko, self._turn, self._passes,
+                self._rows, before)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self._hash == other._hash and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        before = self._before._hash if self._ko_possible() else None
+        return hash((self._hash, self._turn, self._passes, before))
+
+    def _repeats(self, rows: tuple[bytes, ...] | None,
+                 new_hash: int) -> bool:
+        """
+        Determines whether a board (with its hash) breaks the ko rule, or
+        the superko rule if it is in effect. Without the rows of the board,
+        only the hashes are compared, so a board found to repeat only may.
+        """
+        if not self._superko:
+            before = self._before
+            return before is not None and before._hash == new_hash and \
+                rows in (None, before._rows)
+
+        position = self
+        while position is not None:
+            if position._hash == new_hash and rows in (None, position._rows):
+                return True
+            position = position._parent
+        return False
+
+    def _result(self, pos: tuple[int, int]
+                ) -> tuple[tuple[bytes, ...], int, int | None]:
+        """
+        Works out the board after the player to move places a piece on an
+        empty position, with the rules of go.Board.place
+
+        Returns: the rows of the new board, its Zobrist hash, and the
+            player who could then bring back the current board in one move
+            (see _ko)
+        """
+        geo = geometry(self._side)
+        player = self._turn
+        index = geo.index(pos)
+        board = load_board(self._side, self._rows).copy()
+        cells = board.cells
+        alone = all(cells[adjacent] != player
+                    for adjacent in geo.neighbours[index])
+        removed = board.place(index, player)
+        captured = [owner for _, owner in removed if owner != player]
+        suicide = [stone for stone, owner in removed if owner == player]
+
+        ko = None
+        if alone:
+            if len(captured) == 1:
+                # taking back the captured stone could capture the new one
+                ko = captured[0]
+            elif not captured:
+                # a suicide next to the new stone could remove both
+                ko = player
+        if suicide == [index]:
+            # the board is unchanged, as after any lone suicide
+            ko = 0
+        elif len(suicide) == 2:
+            # putting back the other stone would restore the board
+            ko = player
+
+        new_rows = list(self._rows)
+        for stone in [index] + [stone for stone, _ in removed]:
+            row = geo.positions[stone][0]
+            start = row * geo.stride + 1
+            new_rows[row - 1] = bytes(cells[start:start + self._side])
+        return tuple(new_rows), board.hash, ko
+
+
+@lru_cache(maxsize=256)
+def load_board(side: int, rows: tuple[bytes, ...]) -> Board:
+    """
+    Returns a go.Board holding the stones of a position's rows, to apply
+    the rules of the engine to. The boards of the latest positions asked
+    for are kept, so they must not be changed: copy one to play on it.
+    """
+    geo = geometry(side)
+    edge = geo.cells[:geo.stride + 1]
+    board = Board(side)
+    board.load_cells(edge + ROW_BORDER.join(rows) + edge)
+    return board
@@ -0,0 +1,176 @@
+"""
+For SnapshotGo(GoBase), the bookkeeping shared by the Go engines that keep
+no move history, only a snapshot of the board after each placement
+"""
+from abc import abstractmethod
+from collections.abc import Hashable
+
+from base import GoBase, BoardGridType
+
+
+class SnapshotGo(GoBase):
+    """
+    Base class for Go engines that check the ko rules against snapshots of
+    the board: a hashable value of the board after every placement since
+    the game started (or was loaded). It keeps the turn, the passes and
+    the end of the game, and checks the ko rules, validates loaded games
+    and copies the game for simulate_move.
+
+    An engine stores its board, and implements:
+        _snapshot: the snapshot of the current board
+        _placed: the snapshot after the current player places a stone
+        _play: places a stone of the current player, then calls _record
+        _load: stores the stones of a validated grid
+    and the board queries of GoBase (grid, available_moves, piece_at and
+    scores). An engine whose board is mutable also extends _copy.
+    """
+    __slots__ = ("_game_over", "_past_states", "_seen_states",
+                 "_consecutive_passes", "_turn")
+
+    _game_over: bool #holds whether the game is over or not
+    _past_states: list[Hashable] #the snapshot after each placement
+    _seen_states: set[Hashable] #every entry of _past_states
+    _consecutive_passes: int #the number of consecutive passes
+    _turn: int #the current player whose turn it is
+
+    def __init__(self, side: int, players: int, superko: bool = False):
+        """
+        Constructor (see GoBase). An engine calls _start once it has stored
+        its empty board.
+        """
+        super().__init__(side, players, superko)
+        self._turn = 1
+
+    @property
+    def turn(self) -> int:
+        return self._turn
+
+    @property
+    def done(self) -> bool:
+        return self._consecutive_passes >= self._players
+
+    @property
+    def outcome(self) -> list[int]:
+        if not self.done:
+            return []
+
+        scores = self.scores()
+        max_score = max(scores.values())
+        return [player for player, score in scores.items()
+                if score == max_score]
+
+    def legal_move(self, pos: tuple[int, int]) -> bool:
+        if self.piece_at(pos) is not None or self._game_over:
+            return False
+
+        result = self._placed(pos)
+        if self._superko:
+            return result not in self._seen_states
+        if len(self._past_states) > 1:
+            return result != self._past_states[-2]
+        return True
+
+    def apply_move(self, pos: tuple[int, int]) -> None:
+        if self.legal_move(pos):
+            self._play(pos)
+
+    def pass_turn(self) -> None:
+        self._turn = (self._turn % self._players) + 1
+        self._consecutive_passes += 1
+
+        if self._consecutive_passes >= self._players:
+            self._game_over = True
+
+    def load_game(self, turn: int, grid: BoardGridType) -> None:
+        if not 1 <= turn <= self._players:
+            raise ValueError(f"Turn {turn} is not a valid player")
+        if len(grid) != self._side or \
+            any(len(row) != self._side for row in grid):
+            raise ValueError("Grid size does not match the board size")
+        for row in grid:
+            for player in row:
+                if player is not None and not 1 <= player <= self._players:
+                    raise ValueError(f"Grid contains invalid player {player}")
+
+        self._load(grid)
+        self._turn = turn
+        self._start()
+
+    def simulate_move(self, pos: tuple[int, int] | None) -> "GoBase":
+        simulated_game = self._copy()
+        if pos is None:
+            simulated_game.pass_turn()
+        else:
+            simulated_game._play(pos)
+        return simulated_game
+
+    def _start(self) -> None:
+        """
+        Starts the game over from the current board: it becomes the only
+        snapshot, and nobody has passed yet
+        """
+        state = self._snapshot()
+        self._game_over = False
+        self._consecutive_passes = 0
+        self._past_states = [state]
+        self._seen_states = {state}
+
+    def _record(self) -> None:
+        """
+        Records the board after a stone was placed, and moves on to the
+        next player
+        """
+        state = self._snapshot()
+        self._past_states.append(state)
+        self._seen_states.add(state)
+        self._consecutive_passes = 0
+        self._turn = (self._turn % self._players) + 1
+
+    def _copy(self) -> "SnapshotGo":
+        """
+        Returns a copy of the game that can be changed without changing
+        this one
+        """
+        game = type(self).__new__(type(self))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                setattr(game, name, getattr(self, name))
+        game._past_states = self._past_states[:]
+        game._seen_states = set(self._seen_states)
+        return game
+
+    @abstractmethod
+    def _snapshot(self) -> Hashable:
+        """
+        Returns a hashable value identifying the current board
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _placed(self, pos: tuple[int, int]) -> Hashable:
+        """
+        Returns the snapshot of the board after the current player places a
+        stone at pos (replacing any stone there), with its captures,
+        without changing the game
+
+        Raises: ValueError if the position is not on the board
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _play(self, pos: tuple[int, int]) -> None:
+        """
+        Places a stone of the current player at pos (replacing any stone
+        there), with its captures, and records the new board with _record
+
+        Raises: ValueError if the position is not on the board
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _load(self, grid: BoardGridType) -> None:
+        """
+        Replaces the stones on the board with those of a grid already
+        checked to match the game
+        """
+        raise NotImplementedError
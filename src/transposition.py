@@ -0,0 +1,232 @@
+"""
+Transposition table for the bot's search strategies
+"""
+
+import sys
+from collections import OrderedDict
+from itertools import islice
+from typing import Any
+from base import GoBase
+
+# Memory used by one entry of the table apart from its value: the key,
+# the Entry and the slot in the ordered dictionary (measured with
+# tracemalloc, at the worst point of the dictionary's growth)
+ENTRY_BYTES = 288
+
+# Default memory cap of a table
+DEFAULT_BYTES = 16 * 2 ** 20
+
+# Number of least recently used entries the "depth" policy chooses from
+EVICTION_SAMPLE = 4
+
+TableKey = tuple[int, int, int]
+
+
+class Entry:
+    """
+    What a search strategy remembers about a position
+    """
+    __slots__ = ("value", "visits", "depth", "size")
+
+    value: Any #the value of the position, as the strategy defines it
+    visits: int #number of times the position was evaluated or visited
+    depth: int #depth of the search the value came from (0 for a leaf)
+    size: int #memory counted for the entry, in bytes
+
+    def __init__(self, value: Any, visits: int, depth: int, size: int = 0):
+        """
+        Constructor
+
+        Args:
+            value: the value of the position
+            visits: number of times the position was evaluated or visited
+            depth: depth of the search the value came from
+            size: memory counted for the entry, in bytes
+        """
+        self.value = value
+        self.visits = visits
+        self.depth = depth
+        self.size = size
+
+
+def value_bytes(value: Any) -> int:
+    """
+    Returns the memory used by a value and, for tuples, lists, sets and
+    dictionaries, by everything they hold. Objects held more than once,
+    or shared with the rest of the program, are counted every time, so
+    this is an upper bound.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(value_bytes(key) + value_bytes(item)
+                    for key, item in value.items())
+    elif isinstance(value, (tuple, list, set, frozenset)):
+        size += sum(value_bytes(item) for item in value)
+    return size
+
+
+class TranspositionTable:
+    """
+    Cache of search results keyed by position (the Zobrist hash of the
+    board, the player to move and the consecutive passes), so that a
+    position reached by several move orders, or again on a later move, is
+    only evaluated once.
+
+    The entries, with their values (see value_bytes), are kept within the
+    table's memory cap. When it is full, storing a position evicts old
+    ones until the new entry fits: the least
+    recently used entry under the "lru" policy, or the shallowest of the
+    EVICTION_SAMPLE least recently used entries under the "depth" policy,
+    so that expensive deep results outlive cheap leaf evaluations.
+
+    A table should only be shared by strategies that store the same kind
+    of value.
+    """
+    __slots__ = ("_entries", "_max_bytes", "_bytes", "_policy", "hits",
+                 "misses", "evictions")
+
+    _entries: OrderedDict #entries by key, least recently used first
+    _max_bytes: int #memory cap of the entries
+    _bytes: int #memory counted for the entries
+    _policy: str #eviction policy, "lru" or "depth"
+    hits: int #lookups that found an entry
+    misses: int #lookups that found nothing
+    evictions: int #entries removed to make room for new ones
+
+    def __init__(self, max_bytes: int = DEFAULT_BYTES, policy: str = "depth"):
+        """
+        Constructor
+
+        Args:
+            max_bytes: memory cap of the table, in bytes
+            policy: "lru" or "depth" (see the class description)
+
+        Raises: ValueError if the cap is too small for a single entry, or
+            the policy is unknown
+        """
+        if max_bytes < ENTRY_BYTES:
+            raise ValueError(f"Memory cap {max_bytes} is too small")
+        if policy not in ("lru", "depth"):
+            raise ValueError(f"Unknown eviction policy {policy}")
+        self._entries = OrderedDict()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(game: GoBase) -> TableKey:
+        """
+        Returns the key of the current position of a game. The passes
+        are part of it, since the same board is worth something else when
+        one more pass ends the game.
+        """
+        return game.position_hash, game.turn, game.passes
+
+    @property
+    def capacity(self) -> int:
+        """
+        Maximum number of entries the table holds (if their values took no
+        memory)
+        """
+        return self._max_bytes // ENTRY_BYTES
+
+    @property
+    def size(self) -> int:
+        """
+        Memory counted for the entries and their values, in bytes
+        """
+        return self._bytes
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of lookups that found an entry (0 before any lookup)
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: TableKey) -> Entry | None:
+        """
+        Finds the entry of a position, marking it as recently used
+
+        Returns: the entry, or None if the position is not in the table
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: TableKey, value: Any, depth: int = 0,
+              visits: int = 1) -> None:
+        """
+        Records the value of a position. An existing entry from a deeper
+        search is kept, with its visits added to; otherwise the entry is
+        replaced. Old entries are evicted until the entry fits in the
+        memory cap; a value too large to fit on its own is not stored.
+
+        Inputs:
+            key: the key of the position (see key)
+            value: the value of the position
+            depth: depth of the search the value came from
+            visits: number of evaluations or visits the value stands for
+        """
+        entries = self._entries
+        entry = entries.get(key)
+        if entry is not None:
+            entries.move_to_end(key)
+            entry.visits += visits
+            if entry.depth > depth:
+                return
+            visits = entry.visits
+            self._bytes -= entry.size
+            del entries[key]
+
+        size = ENTRY_BYTES + value_bytes(value)
+        if size > self._max_bytes:
+            return
+        while self._bytes + size > self._max_bytes:
+            self._evict()
+        entries[key] = Entry(value, visits, depth, size)
+        self._bytes += size
+
+    def _evict(self) -> None:
+        """
+        Removes one entry according to the eviction policy
+        """
+        if self._policy == "lru":
+            _, entry = self._entries.popitem(last=False)
+        else:
+            oldest = islice(self._entries.items(), EVICTION_SAMPLE)
+            victim, entry = min(oldest, key=lambda item: item[1].depth)
+            del self._entries[victim]
+        self._bytes -= entry.size
+        self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the statistics
+        """
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def summary(self) -> str:
+        """
+        Describes the size and the hit rate of the table, for sizing it
+        """
+        return (f"{len(self._entries)} entries in {self._bytes // 1024}/"
+                f"{self._max_bytes // 1024} KB, "
+                f"{self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate * 100:.1f}% hit rate), "
+                f"{self.evictions} evictions")
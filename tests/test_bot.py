@@ -0,0 +1,40 @@
+import random
+
+from bot import statistics_game, statistics_games
+
+
+def test_statistics_game_is_seeded() -> None:
+    """
+    Check that a game of the statistics depends only on its seed, not on
+    the state of the random module.
+    """
+    random.seed(1)
+    first = statistics_game(4, 'heuristic', 'random', None, None, 1, 7)
+    random.seed(2)
+    second = statistics_game(4, 'heuristic', 'random', None, None, 1, 7)
+    assert first == second
+    assert set(first[2]) == {1}
+
+
+def test_statistics_same_for_any_job_count(capsys) -> None:
+    """
+    Check that the statistics of seeded games are the same whether the
+    games are played one by one or shared out to worker processes.
+    """
+    outputs = []
+    for jobs in (1, 2):
+        statistics_games(6, 3, 'smart', 'random', jobs=jobs, table_mb=1,
+                         seed=5)
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0] == outputs[1]
+    assert "Player 1 tables:" in outputs[0]
+
+
+def test_statistics_game_searches_in_parallel() -> None:
+    """
+    Check that a game whose mcts player searches several trees in
+    parallel is still repeatable from its seed.
+    """
+    first = statistics_game(3, 'mcts', 'random', 8, None, 0, 3, 2)
+    assert statistics_game(3, 'mcts', 'random', 8, None, 0, 3, 2) == first
+    assert first[1] > 0
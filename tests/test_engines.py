@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+import test_go
+from test_go import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from base import GoBase
+from bitboard import BitboardGo
+from go import Go
+
+try:
+    from numpy_go import NumpyGo
+except ImportError:  # NumPy is not installed, so its engine is skipped
+    NumpyGo = None
+
+# The GoBase engines checked against Go
+ENGINES = [
+    pytest.param(BitboardGo, id="bitboard"),
+    pytest.param(NumpyGo, id="numpy",
+                 marks=pytest.mark.skipif(NumpyGo is None,
+                                          reason="NumPy is not installed")),
+]
+
+
+@pytest.fixture(autouse=True, params=ENGINES)
+def engine(request: pytest.FixtureRequest,
+           monkeypatch: pytest.MonkeyPatch) -> type[GoBase]:
+    """
+    Runs every test collected here once for each engine, including the
+    test_go.py contract tests, which play on the engine instead of Go
+    """
+    monkeypatch.setattr(test_go, "Go", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("players", [2, 3, 5, 8])
+def test_engine_matches_go(engine: type[GoBase], players: int) -> None:
+    """
+    Play the same random game on an engine and on Go and check that the
+    board, the legal moves, the turn and the scores agree after every
+    move.
+    """
+    rng = random.Random(players)
+    game = engine(side=7, players=players)
+    go = Go(side=7, players=players)
+
+    for _ in range(150):
+        if go.done:
+            break
+        moves = sorted(move for move in go.available_moves
+                       if go.legal_move(move))
+        assert moves == [move for move in game.available_moves
+                         if game.legal_move(move)]
+        if not moves or rng.random() < 0.05:
+            go.pass_turn()
+            game.pass_turn()
+        else:
+            move = rng.choice(moves)
+            go.apply_move(move)
+            game.apply_move(move)
+        assert game.grid == go.grid
+        assert game.turn == go.turn
+        assert game.scores() == go.scores()
+
+    assert game.done == go.done
+    assert game.outcome == go.outcome
+
+
+def test_engine_load_game_validation(engine: type[GoBase]) -> None:
+    """
+    Check that load_game rejects turns, grids and pieces that do not match
+    the game.
+    """
+    game = engine(side=9, players=3)
+    with pytest.raises(ValueError):
+        game.load_game(turn=4, grid=[[None] * 9 for _ in range(9)])
+    with pytest.raises(ValueError):
+        game.load_game(turn=1, grid=[[None] * 8 for _ in range(8)])
+
+    grid = [[None] * 9 for _ in range(9)]
+    grid[4][4] = 4
+    with pytest.raises(ValueError):
+        game.load_game(turn=1, grid=grid)
+
+
+def test_simulate_occupied_cell_matches_go(engine: type[GoBase]) -> None:
+    """
+    Check that simulating a move on an occupied cell replaces the stone
+    there the same way on every engine: the board, the piece on the cell
+    and the scores agree with Go's, and the game itself is unchanged.
+    """
+    grid = [[None] * 5 for _ in range(5)]
+    grid[0][:3] = [2, 2, 2]
+    grid[1][1] = 1
+    go = Go(5, 2)
+    go.load_game(1, grid)
+    game = engine(5, 2)
+    game.load_game(1, grid)
+
+    for pos in [(1, 2), (2, 2)]:
+        expected = go.simulate_move(pos)
+        simulated = game.simulate_move(pos)
+        assert simulated.grid == expected.grid
+        assert simulated.piece_at(pos) == expected.piece_at(pos) == 1
+        assert simulated.scores() == expected.scores()
+        assert simulated.turn == expected.turn
+        assert game.grid == grid
@@ -0,0 +1,55 @@
+import pytest
+
+from geometry import geometry
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 9])
+def test_geometry_tables(size: int) -> None:
+    """
+    Check the neighbour, diagonal and corner/edge/centre tables against
+    positions worked out by hand from (row, col) coordinates.
+    """
+    geo = geometry(size)
+    assert geometry(size) is geo
+    assert len(geo.points) == size * size
+
+    for index in geo.points:
+        row, col = geo.positions[index]
+        assert geo.index((row, col)) == index
+        assert sorted(geo.neighbour_positions[index]) == sorted(
+            (r, c) for r, c in [(row - 1, col), (row + 1, col),
+                                (row, col - 1), (row, col + 1)]
+            if 1 <= r <= size and 1 <= c <= size)
+        assert sorted(geo.positions[diagonal]
+                      for diagonal in geo.diagonals[index]) == sorted(
+            (r, c) for r, c in [(row - 1, col - 1), (row - 1, col + 1),
+                                (row + 1, col - 1), (row + 1, col + 1)]
+            if 1 <= r <= size and 1 <= c <= size)
+
+    assert sorted(geo.corners + geo.edges + geo.centre) == list(geo.points)
+    assert {geo.positions[corner] for corner in geo.corners} == \
+        {(1, 1), (1, size), (size, 1), (size, size)}
+    assert all(geo.edge_distance[edge] == 0 for edge in geo.edges)
+
+    with pytest.raises(ValueError):
+        geo.index((0, 1))
+
+
+def test_geometry_symmetries() -> None:
+    """
+    Check that the eight symmetries are distinct permutations of the board,
+    that each one is undone by its inverse, and that they send a corner
+    to every corner.
+    """
+    geo = geometry(5)
+    assert len(set(geo.symmetries)) == 8
+    for symmetry, mapping in enumerate(geo.symmetries):
+        assert sorted(mapping[index] for index in geo.points) == \
+            list(geo.points)
+        undo = geo.symmetries[geo.inverses[symmetry]]
+        assert all(undo[mapping[index]] == index for index in geo.points)
+
+    assert geo.transform((2, 3), 0) == (2, 3)
+    assert geo.transform((1, 2), 1) == (2, 5)
+    assert {geo.transform((1, 1), symmetry) for symmetry in range(8)} == \
+        {(1, 1), (1, 5), (5, 1), (5, 5)}
@@ -826,3 +826,61 @@ def test_three_player_game_with_territories_and_neutral_zone() -> None:
     assert len(game.outcome) == 3, "All players should have scores in this setup."
 
 
+
+def test_superko_rule_blocks_earlier_position() -> None:
+    """
+    Three kos are taken and then retaken in turn. The last retake recreates
+    the loaded position, which simple ko allows but superko forbids.
+    """
+    game_state = [[None] * 19 for _ in range(1, 20)]
+    for row, col in [(1, 1), (2, 2), (0, 2), (1, 3), (6, 7), (5, 8), (4, 7),
+                     (9, 9), (10, 10), (8, 10), (9, 11)]:
+        game_state[row][col] = 1
+    for row, col in [(2, 3), (1, 4), (0, 3), (5, 5), (6, 6), (4, 6), (5, 7),
+                     (10, 11), (9, 12), (8, 11)]:
+        game_state[row][col] = 2
+
+    for superko in (False, True):
+        game = Go(side=19, players=2, superko=superko)
+        game.load_game(turn=2, grid=game_state)
+        for move in [(2, 3), (6, 7), (10, 11), (2, 4), (6, 8)]:
+            assert game.legal_move(move), f"Expected {move} to be legal"
+            game.apply_move(move)
+
+        assert game.legal_move((10, 12)) is not superko, \
+            "Retaking (10, 12) recreates the loaded board"
+
+def test_capture_resolved_before_suicide() -> None:
+    """
+    Player 1 fills the last liberty of its own stone at (1, 1) while taking
+    the last liberty of Player 2's stone at (3, 1). The Player 2 stone must
+    be captured, so Player 1's chain survives.
+    """
+    game_state = [[None] * 19 for _ in range(1, 20)]
+    game_state[0][0] = 1
+    game_state[2][1] = 1
+    game_state[3][0] = 1
+    game_state[0][1] = 2
+    game_state[1][1] = 2
+    game_state[2][0] = 2
+
+    game = Go(side=19, players=2)
+    game.load_game(turn=1, grid=game_state)
+    game.apply_move((2, 1))
+
+    assert game.piece_at((3, 1)) is None, "Expected (3, 1) to be captured"
+    assert game.piece_at((1, 1)) == 1 and game.piece_at((2, 1)) == 1
+
+def test_scoring_counts_each_region_once() -> None:
+    """
+    Check that an empty region bordered by a single player counts once
+    towards that player's score, and that an empty board scores nothing.
+    """
+    game = Go(side=9, players=2)
+    assert game.scores() == {1: 0, 2: 0}
+
+    game.apply_move((5, 5))
+    assert game.scores() == {1: 81, 2: 0}
+
+    game.apply_move((1, 1))
+    assert game.scores() == {1: 1, 2: 1}
@@ -0,0 +1,522 @@
+import pickle
+import random
+
+import pytest
+
+from go import Go
+
+
+def test_position_hash_matches_loaded_board() -> None:
+    """
+    Check that the incrementally updated position hash (including captures)
+    matches the hash of the same board loaded from scratch.
+    """
+    go = Go(19, 2)
+    for move in [(5, 6), (5, 7), (4, 7), (6, 6), (3, 3), (4, 6), (10, 10), (5, 5)]:
+        go.apply_move(move)
+    assert go.piece_at((5, 6)) is None, "Expected (5, 6) to have been captured"
+
+    loaded = Go(19, 2)
+    loaded.load_game(turn=go.turn, grid=go.grid)
+
+    assert go.position_hash == loaded.position_hash
+    assert go.position_hash != Go(19, 2).position_hash
+
+def test_chain_at_and_liberties() -> None:
+    """
+    Check that chain_at and liberties report the connected block and its
+    liberties, and that they stay up to date after a capture.
+    """
+    go = Go(9, 2)
+    for move in [(1, 1), (5, 5), (1, 2), (2, 1), (3, 3), (2, 2)]:
+        go.apply_move(move)
+
+    assert go.chain_at((1, 1)) == [(1, 1), (1, 2)]
+    assert go.liberties((1, 2)) == [(1, 3)]
+    assert go.in_atari((1, 1))
+    assert go.chain_at((4, 4)) == []
+    assert go.liberties((4, 4)) == []
+
+    go.apply_move((9, 9))   # Player 1 elsewhere
+    go.apply_move((1, 3))   # Player 2 captures (1, 1) and (1, 2)
+
+    assert go.piece_at((1, 1)) is None and go.piece_at((1, 2)) is None
+    assert go.chain_at((2, 1)) == [(2, 1), (2, 2)]
+    assert go.liberties((2, 1)) == [(1, 1), (1, 2), (2, 3), (3, 1), (3, 2)]
+    assert go.liberties((1, 3)) == [(1, 2), (1, 4), (2, 3)]
+    assert not go.in_atari((1, 3))
+
+def test_undo_restores_capture() -> None:
+    """
+    Check that undo takes back a capturing move (restoring the captured
+    stones, the turn and the position hash) and that redo plays it again.
+    """
+    go = Go(9, 2)
+    for move in [(5, 6), (5, 7), (4, 7), (6, 6), (3, 3), (4, 6)]:
+        go.play(move)
+    grid_before = go.grid
+    hash_before = go.position_hash
+
+    go.play((9, 9))
+    go.play((5, 5))   # Player 2 captures (5, 6)
+    assert go.piece_at((5, 6)) is None
+
+    go.undo()
+    assert go.piece_at((5, 5)) is None
+    assert go.piece_at((5, 6)) == 1
+    assert go.liberties((5, 6)) == [(5, 5)]
+    assert go.turn == 2
+
+    go.undo()
+    assert go.grid == grid_before
+    assert go.position_hash == hash_before
+    assert go.turn == 1
+
+    go.redo()
+    go.redo()
+    assert go.piece_at((5, 6)) is None
+    assert go.piece_at((5, 5)) == 2
+    assert go.turn == 1
+
+def test_undo_passes_and_errors() -> None:
+    """
+    Check that passes can be undone, ending and un-ending the game, and that
+    undo and redo raise ValueError when there is nothing to take back.
+    """
+    go = Go(9, 2)
+    with pytest.raises(ValueError):
+        go.undo()
+
+    go.apply_move((3, 3))
+    go.pass_turn()
+    go.pass_turn()
+    assert go.done
+
+    go.undo()
+    assert not go.done
+    assert go.turn == 1
+    assert go.legal_move((4, 4))
+
+    go.play((4, 4))
+    with pytest.raises(ValueError):
+        go.redo()
+
+def test_clone_is_independent() -> None:
+    """
+    Check that a clone and its parent can both keep playing without
+    affecting each other, and that the clone keeps the ko history.
+    """
+    game_state = [[None] * 19 for _ in range(1, 20)]
+    game_state[1][1] = 1
+    game_state[0][2] = 1
+    game_state[2][2] = 1
+    game_state[1][3] = 1
+    game_state[1][4] = 2
+    game_state[0][3] = 2
+    game_state[2][3] = 2
+
+    go = Go(19, 2)
+    go.load_game(turn=2, grid=game_state)
+    go.apply_move((2, 3))   # Player 2 takes the ko
+
+    clone = go.clone()
+    assert not clone.legal_move((2, 4)), "The clone should still see the ko"
+
+    clone.apply_move((10, 10))
+    go.apply_move((15, 15))
+    assert clone.piece_at((10, 10)) == 1 and clone.piece_at((15, 15)) is None
+    assert go.piece_at((15, 15)) == 1 and go.piece_at((10, 10)) is None
+
+    clone.undo()
+    clone.undo()
+    assert clone.piece_at((2, 3)) is None and clone.piece_at((2, 4)) == 1
+    assert go.piece_at((2, 3)) == 2 and go.piece_at((2, 4)) is None
+
+def test_simulate_move_on_occupied_cell() -> None:
+    """
+    Check that simulating a move on an occupied cell replaces the stone
+    there (leaving the game itself unchanged), and that play refuses it.
+    """
+    grid = [[None] * 5 for _ in range(5)]
+    grid[0][:3] = [2, 2, 2]
+    go = Go(5, 2)
+    go.load_game(1, grid)
+
+    simulated = go.simulate_move((1, 2))
+    assert simulated.piece_at((1, 2)) == 1
+    assert simulated.chain_at((1, 1)) == [(1, 1)]
+    assert simulated.chain_at((1, 3)) == [(1, 3)]
+    assert simulated.turn == 2
+    assert go.grid == grid
+    assert go.chain_at((1, 1)) == [(1, 1), (1, 2), (1, 3)]
+
+    with pytest.raises(ValueError):
+        go.play((1, 2))
+    assert go.grid == grid
+
+def test_board_accessors() -> None:
+    """
+    Check that the board accessors describe the stones, the empty cells
+    and the latest move with its captures.
+    """
+    go = Go(5, 2)
+    assert go.last_move == (0, ())
+    for move in [(1, 2), (1, 1), (2, 1)]:
+        go.apply_move(move)
+    index = go.geometry.index((2, 1))
+    corner = go.geometry.index((1, 1))
+    assert go.last_move == (index, ((corner, 2),))
+    assert go.cells[index] == 1 and go.cells[corner] == 0
+    assert corner in go.empties.tolist()
+    assert len(go.empties) == 23
+    assert list(go.stone_counts[1:3]) == [2, 0]
+    assert go.territory_counts()[1] == 23
+
+    go.pass_turn()
+    assert go.last_move == (0, ())
+
+def test_moves_legal_only() -> None:
+    """
+    Check that moves(legal_only=True) leaves out the ko point and suicide
+    points, while available_moves still lists every empty point.
+    """
+    game_state = [[None] * 9 for _ in range(9)]
+    game_state[1][1] = 1
+    game_state[0][2] = 1
+    game_state[2][2] = 1
+    game_state[1][3] = 1
+    game_state[1][4] = 2
+    game_state[0][3] = 2
+    game_state[2][3] = 2
+    # (9, 9) is surrounded by Player 2's stones, so it is suicide for Player 1
+    game_state[7][8] = 2
+    game_state[8][7] = 2
+
+    go = Go(9, 2)
+    go.load_game(turn=2, grid=game_state)
+    go.apply_move((2, 3))   # Player 2 takes the ko at (2, 4)
+
+    empty = {(row + 1, col + 1) for row in range(9) for col in range(9)
+             if go.grid[row][col] is None}
+    assert set(go.available_moves) == empty
+    assert set(go.moves()) == empty
+
+    legal = set(go.moves(legal_only=True))
+    assert legal == empty - {(2, 4), (9, 9)}
+    assert go.legal_move((9, 9)), "Suicide is still a legal move"
+    assert not go.legal_move((2, 4))
+
+def test_incremental_scores_match_fresh_count() -> None:
+    """
+    Check that the incrementally maintained stone counts and territory
+    agree with a freshly loaded copy of the board after every move of a
+    random game, including captures and undone moves.
+    """
+    rng = random.Random(7)
+    go = Go(7, 3)
+    played = 0
+    for _ in range(120):
+        if go.done:
+            break
+        moves = go.moves(legal_only=True)
+        if played and rng.random() < 0.1:
+            go.undo()
+            played -= 1
+        elif moves:
+            go.apply_move(rng.choice(moves))
+            played += 1
+        else:
+            go.pass_turn()
+            played += 1
+
+        fresh = Go(7, 3)
+        fresh.load_game(turn=go.turn, grid=go.grid)
+        assert go.scores() == fresh.scores()
+
+def test_history_rebuilds_boards_between_keyframes() -> None:
+    """
+    Check that a long random game (spanning several history keyframes) can
+    be undone move by move back to the empty board, with the board, the
+    position hash and the legal moves matching those seen while playing.
+    """
+    rng = random.Random(7)
+    go = Go(7, 2, superko=True)
+    seen = []
+    while len(seen) < 120 and not go.done:
+        seen.append((go.grid, go.position_hash, go.turn,
+                     sorted(go.moves(legal_only=True))))
+        moves = go.moves(legal_only=True)
+        go.play(rng.choice(moves) if moves and rng.random() > 0.05 else None)
+
+    for grid, position_hash, turn, legal in reversed(seen):
+        go.undo()
+        assert go.grid == grid
+        assert go.position_hash == position_hash
+        assert go.turn == turn
+        assert sorted(go.moves(legal_only=True)) == legal
+
+    with pytest.raises(ValueError):
+        go.undo()
+
+def test_canonical_key_is_shared_by_symmetric_positions() -> None:
+    """
+    Check that the eight rotations and reflections of a position share one
+    canonical key, that the incrementally kept symmetric hashes match those
+    of freshly loaded boards, and that moves map to the canonical board
+    and back.
+    """
+    rng = random.Random(3)
+    go = Go(7, 2)
+    for _ in range(30):
+        go.play(rng.choice(go.moves(legal_only=True)))
+    key, symmetry = go.canonical_key
+    geo = go.geometry
+
+    for transform in range(8):
+        grid = [[None] * 7 for _ in range(7)]
+        for row in range(1, 8):
+            for col in range(1, 8):
+                new_row, new_col = geo.transform((row, col), transform)
+                grid[new_row - 1][new_col - 1] = go.piece_at((row, col))
+        other = Go(7, 2)
+        other.load_game(1, grid)
+        assert other.canonical_key[0] == key
+        assert other.position_hash == \
+            go._board.symmetric_hashes[transform]  # pylint: disable=protected-access
+
+    canonical = Go(7, 2)
+    canonical.load_game(1, [[None] * 7 for _ in range(7)])
+    grid = [[None] * 7 for _ in range(7)]
+    for row in range(1, 8):
+        for col in range(1, 8):
+            new_row, new_col = go.canonical_move((row, col), symmetry)
+            grid[new_row - 1][new_col - 1] = go.piece_at((row, col))
+            assert go.original_move((new_row, new_col), symmetry) == (row, col)
+    canonical.load_game(1, grid)
+    assert canonical.position_hash == key
+    assert go.canonical_move(None, symmetry) is None
+
+def test_engine_objects_have_no_instance_dict() -> None:
+    """
+    Check that Go and Board store their state in slots, and that clones
+    copy it correctly.
+    """
+    go = Go(9, 2, superko=True)
+    go.play((3, 3))
+    assert not hasattr(go, "__dict__")
+    assert not hasattr(go._board, "__dict__")  # pylint: disable=protected-access
+
+    clone = go.clone()
+    clone.play((4, 4))
+    assert clone.piece_at((3, 3)) == 1
+    assert go.piece_at((4, 4)) is None
+    assert clone.chain_at((4, 4)) == [(4, 4)]
+
+@pytest.mark.parametrize("superko", [False, True])
+def test_to_bytes_round_trip(superko: bool) -> None:
+    """
+    Check that a game packed with to_bytes (directly or through pickle)
+    comes back with the same board, turn, rules and history.
+    """
+    rng = random.Random(7)
+    go = Go(9, 3, superko)
+    go.load_game(2, [[rng.choice([None, None, 1, 2, 3]) for _ in range(9)]
+                     for _ in range(9)])
+    for _ in range(60):
+        moves = go.moves(legal_only=True)
+        go.play(rng.choice(moves) if moves else None)
+    go.pass_turn()
+
+    data = go.to_bytes()
+    # 2 bits for each of the 81 points, 2 bytes for each of the 61 moves
+    assert len(data) == 18 + 21 + 2 * 61
+    for restored in [Go.from_bytes(data), pickle.loads(pickle.dumps(go))]:
+        assert restored.grid == go.grid
+        assert restored.turn == go.turn
+        assert restored.position_hash == go.position_hash
+        assert sorted(restored.moves(legal_only=True)) == \
+            sorted(go.moves(legal_only=True))
+        restored.undo()
+        restored.undo()
+        clone = go.clone()
+        clone.undo()
+        clone.undo()
+        assert restored.grid == clone.grid
+        assert restored.turn == clone.turn
+
+    with pytest.raises(ValueError):
+        Go.from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        Go.from_bytes(b"\xff" + data[1:])
+
+def test_check_move_result_is_committed() -> None:
+    """
+    Check that check_move describes the move, that the result is kept
+    until the board changes, and that apply_move commits it.
+    """
+    go = Go(5, 2)
+    for move in [(1, 2), (2, 2), (2, 1), (3, 1), (5, 5), (1, 3), (5, 4)]:
+        go.apply_move(move)
+    result = go.check_move((1, 1))
+    assert result is not None
+    assert result.player == 2
+    assert not result.suicide
+    assert len(result.captured) == 2
+    assert go.check_move((1, 1)) is result
+    assert go.legal_move((1, 1))
+
+    clone = go.clone()
+    clone.play((1, 1))
+    go.apply_move((1, 1))
+    assert go.grid == clone.grid
+    assert go.position_hash == result.hash == clone.position_hash
+    assert go.chain_at((1, 1)) == [(1, 1)]
+    assert sorted(go.liberties((1, 1))) == [(1, 2), (2, 1)]
+    assert go.check_move((1, 1)) is None
+
+    go.undo()
+    assert go.check_move((1, 1)) is not result
+
+def ko_trial_grid() -> list:
+    """
+    Returns a 6x6 board for 3 players where, once player 2 has captured
+    at (3, 3) and player 3 has passed, player 1 retaking at (3, 4) is
+    tried on the board for the ko rule
+    """
+    grid = [[None] * 6 for _ in range(6)]
+    stones = {1: [(3, 4), (2, 3), (3, 2), (4, 1), (5, 2)],
+              2: [(2, 4), (4, 4), (3, 5)],
+              3: [(4, 2), (4, 3)]}
+    for player, positions in stones.items():
+        for row, col in positions:
+            grid[row - 1][col - 1] = player
+    return grid
+
+def test_checked_move_survives_clone_ko_trial() -> None:
+    """
+    Check that a ko trial in a clone sharing the board does not change
+    the chains the parent's checked move refers to.
+    """
+    go = Go(6, 3)
+    go.load_game(2, ko_trial_grid())
+    go.apply_move((3, 3))
+    go.pass_turn()
+    assert go.check_move((5, 3)) is not None
+
+    assert not go.clone().legal_move((3, 4))
+    go.apply_move((5, 3))
+    assert go.piece_at((5, 3)) == 1
+    assert go.piece_at((4, 2)) is None and go.piece_at((4, 3)) is None
+
+def board_state(go: Go) -> tuple:
+    """
+    Returns the cells, the chain ids and the hash of a game's board
+    """
+    board = go._board  # pylint: disable=protected-access
+    return (bytes(board.cells), [board.chain_id(index)
+                                 for index in range(len(board.cells))],
+            board.hash)
+
+@pytest.mark.parametrize("superko", [False, True])
+def test_clone_queries_leave_parent_board(superko: bool) -> None:
+    """
+    Check that legality queries on a clone sharing the board, including
+    the moves tried for the ko and superko rules, leave the board of the
+    game it was cloned from unchanged.
+    """
+    go = Go(6, 3, superko=superko)
+    go.load_game(2, ko_trial_grid())
+    go.apply_move((3, 3))
+    go.pass_turn()
+    before = board_state(go)
+
+    clone = go.clone()
+    assert not clone.legal_move((3, 4))
+    assert clone.would_violate_superko((3, 4)) or \
+        clone.would_violate_ko((3, 4))
+    clone.moves(legal_only=True)
+    clone.check_move((5, 3))
+    assert board_state(go) == before
+    assert clone.grid == go.grid
+    assert clone.position_hash == go.position_hash
+
+def test_legal_moves_survive_repeat_checks() -> None:
+    """
+    Check that the legal moves are all found when one of them is tried on
+    the board for the superko rule (which reorders the empty cells), and
+    match the moves check_move accepts.
+    """
+    go = Go(3, 2, superko=True)
+    for move in [(1, 2), (2, 2), (3, 1), (3, 2), (2, 1), (1, 1), (2, 1),
+                 None]:
+        go.play(move)
+
+    legal = go.moves(legal_only=True)
+    expected = []
+    for move in go.moves():
+        result = go.check_move(move)
+        if result is not None and not result.suicide:
+            expected.append(move)
+    assert (1, 1) in expected
+    assert sorted(legal) == sorted(expected)
+    assert sorted(go.moves(legal_only=True)) == sorted(expected)
+
+def test_history_limit_bounds_history() -> None:
+    """
+    Check that a game with a history limit keeps a bounded history, plays
+    like a game without one (including the ko rule), and can undo at
+    least the latest history_limit moves.
+    """
+    rng = random.Random(3)
+    bounded = Go(5, 2, history_limit=4)
+    full = Go(5, 2)
+    for _ in range(200):
+        if full.done:
+            break
+        moves = sorted(full.moves(legal_only=True))
+        assert sorted(bounded.moves(legal_only=True)) == moves
+        move = rng.choice(moves) if moves and rng.random() > 0.1 else None
+        bounded.play(move)
+        full.play(move)
+    assert bounded._history.depth == full._history.depth  # pylint: disable=protected-access
+    entries = 0
+    node = bounded._history  # pylint: disable=protected-access
+    while node.parent is not None:
+        entries += 1
+        node = node.parent
+    assert 4 <= entries <= 2 * 4 + 2
+
+    restored = pickle.loads(pickle.dumps(bounded))
+    for game in [bounded, restored]:
+        for _ in range(4):
+            game.undo()
+    for _ in range(4):
+        full.undo()
+    assert bounded.grid == restored.grid == full.grid
+    assert sorted(bounded.moves(legal_only=True)) == \
+        sorted(full.moves(legal_only=True))
+    with pytest.raises(ValueError):
+        for _ in range(entries):
+            bounded.undo()
+
+    with pytest.raises(ValueError):
+        Go(5, 2, superko=True, history_limit=4)
+    with pytest.raises(ValueError):
+        Go(5, 2, history_limit=0)
+
+def test_large_history_limit_round_trip() -> None:
+    """
+    Check that a history limit too large for two bytes survives to_bytes
+    and pickle.
+    """
+    go = Go(5, 2, history_limit=70000)
+    for move in [(1, 1), (2, 2), None]:
+        go.play(move)
+
+    for restored in [Go.from_bytes(go.to_bytes()),
+                     pickle.loads(pickle.dumps(go))]:
+        assert restored._history_limit == 70000  # pylint: disable=protected-access
+        assert restored.grid == go.grid
+        for _ in range(3):
+            restored.undo()
+        assert restored.grid == Go(5, 2).grid
@@ -0,0 +1,98 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from go import Go
+from mcts import mcts_move, playout, search, search_worker
+
+
+def atari_grid() -> list:
+    """
+    Returns a 5x5 board where player 1 can capture four stones at (3, 4)
+    """
+    grid = [[None] * 5 for _ in range(5)]
+    for row, col in [(1, 2), (1, 3), (2, 1), (3, 1), (4, 2), (4, 3), (2, 4)]:
+        grid[row - 1][col - 1] = 1
+    for row, col in [(2, 2), (2, 3), (3, 2), (3, 3)]:
+        grid[row - 1][col - 1] = 2
+    return grid
+
+
+class FakeClock:
+    """
+    Stands in for time.perf_counter: each reading moves the time on by a
+    fixed step, so a time budget lasts a known number of readings (the
+    step should be a power of two, for exact sums)
+    """
+
+    def __init__(self, step: float):
+        self.step = step
+        self.readings = 0
+
+    def __call__(self) -> float:
+        self.readings += 1
+        return self.readings * self.step
+
+
+def test_mcts_captures_group_in_atari() -> None:
+    """
+    Check that the search finds the capture of a large group in atari, and
+    leaves the game it searched unchanged.
+    """
+    grid = atari_grid()
+    go = Go(5, 2)
+    go.load_game(1, grid)
+
+    assert mcts_move(go, playouts=300, rng=random.Random(0)) == (3, 4)
+    assert go.grid == grid
+    assert go.turn == 1
+    assert go._history.parent is None  # pylint: disable=protected-access
+
+
+def test_mcts_budgets(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Check that the search stops once its time budget is used up, on a
+    clock that moves on a quarter of a second at each reading (so a
+    second lasts 4 playouts), and passes when there is nothing to choose
+    between.
+    """
+    monkeypatch.setattr(time, "perf_counter", FakeClock(0.25))
+    go = Go(9, 2)
+    assert search(go, None, 1000, random.Random(1)).visits == 4
+    assert search(go, 2, 1000, random.Random(1)).visits == 2
+    move = mcts_move(go, time_ms=1000, rng=random.Random(1))
+    assert move is None or go.legal_move(move)
+
+    go.pass_turn()
+    go.pass_turn()
+    assert mcts_move(go, playouts=10) is None
+
+
+def test_playout_finishes_game() -> None:
+    """
+    Check that a playout plays the game until every player passes, without
+    filling its own eyes, and rewards the winners.
+    """
+    go = Go(5, 3)
+    rewards = playout(go, random.Random(2))
+    assert go.done
+    assert sum(rewards.values()) == 1
+    assert set(rewards) == {1, 2, 3}
+
+
+def test_parallel_mcts_merges_workers() -> None:
+    """
+    Check that root-parallel search runs a share of the playouts in each
+    worker and still finds the capture.
+    """
+    go = Go(5, 2)
+    go.load_game(1, atari_grid())
+    visits = search_worker(go.to_bytes(), 50, None, 3)
+    assert sum(visits.values()) == 50
+    assert (3, 4) in visits
+
+    with ProcessPoolExecutor(2) as pool:
+        assert mcts_move(go, playouts=600, rng=random.Random(0), jobs=2,
+                         pool=pool) == (3, 4)
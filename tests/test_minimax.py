@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from go import Go
+from minimax import Search, minimax_move
+from test_mcts import FakeClock, atari_grid
+from transposition import TranspositionTable
+
+
+def plain_minimax(search: Search, depth: int) -> float:
+    """
+    Values the position of a search by minimax without pruning, counting
+    the estimate of every board from scratch
+    """
+    game = search.game
+    if game.done:
+        return search.score()
+    if depth == 0:
+        return search.estimate(game.cells, game.geometry.points)
+    values = []
+    for move in search.moves(0):
+        game.play(move)
+        values.append(plain_minimax(search, depth - 1))
+        game.undo()
+    return max(values) if game.turn == search.player else min(values)
+
+
+@pytest.mark.parametrize("players", [2, 3])
+def test_alpha_beta_matches_minimax(players: int) -> None:
+    """
+    Check that pruning, move ordering and the incremental estimate do not
+    change the value of a position, with and without a transposition
+    table, and that the search leaves the game as it found it.
+    """
+    go = Go(3, players)
+    go.apply_move((2, 2))
+    grid = go.grid
+    expected = plain_minimax(Search(go), 3)
+
+    search = Search(go)
+    value = search.estimate(go.cells, go.geometry.points)
+    assert search.alpha_beta(3, 0, float('-inf'), float('inf'),
+                             value) == expected
+    assert search.nodes > 1
+    assert Search(go, TranspositionTable()).alpha_beta(
+        3, 0, float('-inf'), float('inf'), value) == expected
+    assert go.grid == grid
+
+
+def test_minimax_captures_group_in_atari() -> None:
+    """
+    Check that the search finds the capture of a large group in atari, and
+    leaves the game it searched unchanged.
+    """
+    grid = atari_grid()
+    go = Go(5, 2)
+    go.load_game(1, grid)
+
+    assert minimax_move(go, max_depth=2) == (3, 4)
+    assert go.grid == grid
+    assert go.last_move == (0, ())
+
+
+def test_minimax_budgets(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Check that iterative deepening stops once its time budget is used up,
+    on a clock that moves on 1/1024 s at each reading (one per position
+    searched), that a table kept across moves is filled, and that the
+    search passes when there is nothing to choose between.
+    """
+    clock = FakeClock(1 / 1024)
+    monkeypatch.setattr(time, "perf_counter", clock)
+    go = Go(9, 2)
+    table = TranspositionTable()
+    move = minimax_move(go, time_ms=1000, table=table)
+    # one reading for the deadline, then one per position until it passes
+    assert clock.readings == 1 + 1024
+    assert go.legal_move(move)
+    assert len(table) > 0
+
+    go.pass_turn()
+    go.pass_turn()
+    assert minimax_move(go) is None
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from go import Go
+from numpy_go import GoBatch
+
+
+@pytest.mark.parametrize("players", [2, 3])
+def test_batch_matches_go(players: int) -> None:
+    """
+    Play a batch of random games with GoBatch, replay each of them on Go,
+    and check that the boards, turns, finished games and scores agree
+    after every step (including ignored moves and passes).
+    """
+    rng = random.Random(players)
+    batch = GoBatch(games=6, side=5, players=players, seed=players)
+    games = [Go(side=5, players=players) for _ in range(batch.games)]
+
+    for _ in range(120):
+        moves = batch.random_moves()
+        for k in range(batch.games):
+            if rng.random() < 0.1:
+                moves[k] = -1
+        played = batch.step(moves)
+
+        boards = batch.boards.tolist()
+        for k, go in enumerate(games):
+            if not go.done:
+                before = (go.grid, go.turn)
+                if moves[k] < 0:
+                    go.pass_turn()
+                else:
+                    go.apply_move((moves[k] // 5 + 1, moves[k] % 5 + 1))
+                assert played[k] == ((go.grid, go.turn) != before or
+                                     moves[k] < 0)
+            assert boards[k] == [[piece or 0 for piece in row]
+                                 for row in go.grid]
+            assert batch.turn[k] == go.turn
+            assert batch.done[k] == go.done
+
+    scores = batch.scores()
+    for k, go in enumerate(games):
+        assert scores[k].tolist() == [go.scores()[player]
+                                      for player in range(1, players + 1)]
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from bot import simulated_game
+from go import Go
+from playout import random_playout
+
+
+@pytest.mark.parametrize("side, players", [(2, 2), (5, 3), (9, 2)])
+def test_random_playout_board_is_valid(side: int, players: int) -> None:
+    """
+    Check that a light playout is repeatable with the same seed, stops
+    after max_moves, and leaves a board where every chain has a liberty
+    and the position hash matches the stones.
+    """
+    game, move_count = random_playout(side, 100, players, random.Random(4))
+    again, _ = random_playout(side, 100, players, random.Random(4))
+    assert game.grid == again.grid
+    assert move_count == 100
+    assert set(game.scores()) == set(range(1, players + 1))
+
+    for row in range(1, side + 1):
+        for col in range(1, side + 1):
+            if game.piece_at((row, col)) is not None:
+                assert game.liberties((row, col))
+
+    loaded = Go(side, players)
+    loaded.load_game(game.turn, game.grid)
+    assert game.position_hash == loaded.position_hash
+    assert game.scores() == loaded.scores()
+
+
+@pytest.mark.parametrize("side, players", [(3, 2), (5, 3), (7, 2)])
+def test_random_playout_replays_on_go(side: int, players: int) -> None:
+    """
+    Check that the moves of a light playout, replayed through the Go
+    engine, are all legal there and end with the same board, turn,
+    captures and scores.
+    """
+    moves: list = []
+    game, move_count = random_playout(side, 300, players, random.Random(2),
+                                      moves)
+    assert len(moves) <= move_count
+
+    go = Go(side, players)
+    captured = 0
+    for move in moves:
+        if move is None:
+            go.pass_turn()
+            continue
+        assert go.legal_move(move)
+        go.apply_move(move)
+        captured += len(go.last_move[1])
+    placed = sum(move is not None for move in moves)
+
+    assert go.grid == game.grid
+    assert go.turn == game.turn
+    assert go.done == game.done
+    assert go.scores() == game.scores()
+    assert captured == placed - sum(go.stone_counts) > 0
+
+
+def test_simulated_game_uses_light_playout() -> None:
+    """
+    Check that random-vs-random games are played by the light playout
+    engine, with as many moves as the other strategies are allowed.
+    """
+    random.seed(7)
+    game, move_count = simulated_game(9, 'random', 'random')
+    assert move_count <= 256
+    assert game._history.parent is None  # pylint: disable=protected-access
+    assert sum(game.scores().values()) > 0
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from go import Go
+from position import Position
+
+
+@pytest.mark.parametrize("superko", [False, True])
+def test_position_matches_go(superko: bool) -> None:
+    """
+    Play the same random games on Position and Go and check that the
+    board, the hash, the legal moves and the scores agree after every move.
+    """
+    rng = random.Random(int(superko))
+    for players in [2, 3]:
+        position = Position(5, players, superko)
+        go = Go(5, players, superko)
+        for _ in range(80):
+            if go.done:
+                break
+            legal = sorted(move for move in go.available_moves
+                           if go.legal_move(move))
+            assert legal == [move for move in position.available_moves
+                             if position.legal_move(move)]
+            move = rng.choice(legal) if legal and rng.random() > 0.1 else None
+            position = position.play(move)
+            go.play(move)
+            assert position.grid == go.grid
+            assert position.turn == go.turn
+            assert position.position_hash == go.position_hash
+            assert position.scores() == go.scores()
+        assert position.done == go.done
+
+
+def test_position_play_shares_rows() -> None:
+    """
+    Check that playing a move leaves the parent unchanged and reuses every
+    row of the board that the move did not change.
+    """
+    position = Position(9, 2).play((3, 3)).play((5, 5))
+    child = position.play((7, 2))
+    assert position.piece_at((7, 2)) is None
+    assert child.piece_at((7, 2)) == 1
+    for row in range(9):
+        if row == 6:
+            assert child._rows[row] is not position._rows[row]  # pylint: disable=protected-access
+        else:
+            assert child._rows[row] is position._rows[row]  # pylint: disable=protected-access
+
+    with pytest.raises(ValueError):
+        child.play((7, 2))
+    with pytest.raises(ValueError):
+        child.play((10, 1))
+
+
+def test_position_equality_and_hashing() -> None:
+    """
+    Check that positions reached by different move orders are equal and
+    share a dict entry, while a different player to move or a different
+    ko situation gives a different position.
+    """
+    first = Position(7, 2).play((1, 1)).play((2, 2)).play((3, 3))
+    second = Position(7, 2).play((3, 3)).play((2, 2)).play((1, 1))
+    assert first == second
+    assert {first: "seen"}[second] == "seen"
+    assert first != first.play(None)
+
+    # a ko: 2 takes at (2, 2), after which 1 may not take back at (2, 3)
+    ko = Position(4, 2)
+    for move in [(1, 2), (1, 3), (2, 1), (2, 4), (3, 2), (3, 3), (2, 3),
+                 (2, 2)]:
+        ko = ko.play(move)
+    assert not ko.legal_move((2, 3))
+    with pytest.raises(ValueError):
+        ko.play((2, 3))
+    same_board = Position.from_grid(ko.grid, ko.turn, 2)
+    assert same_board.legal_move((2, 3))
+    assert same_board != ko
+
+
+def test_position_converts_to_and_from_go() -> None:
+    """
+    Check that a position survives a round trip through Go.
+    """
+    go = Go(6, 3)
+    for move in [(1, 1), (2, 2), (3, 3), (4, 4), (1, 2)]:
+        go.apply_move(move)
+    position = Position.from_game(go)
+    assert position.grid == go.grid
+    assert position.turn == go.turn
+    assert position.position_hash == go.position_hash
+    assert position.to_game().grid == go.grid
+    assert Position.from_game(position.to_game()) == position
+
+    with pytest.raises(ValueError):
+        Position.from_grid(go.grid, 4, 3)
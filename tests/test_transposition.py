@@ -0,0 +1,117 @@
+import random
+import tracemalloc
+
+import pytest
+
+from bot import smart_strategy
+from go import Go
+from transposition import ENTRY_BYTES, TranspositionTable, value_bytes
+
+
+def test_table_lookup_and_statistics() -> None:
+    """
+    Check that stored positions are found, that a deeper result is kept
+    over a shallower one, and that hits and misses are counted.
+    """
+    table = TranspositionTable(100 * ENTRY_BYTES)
+    assert table.capacity == 100
+    go = Go(5, 2)
+    key = table.key(go)
+    assert table.lookup(key) is None
+
+    table.store(key, 1.5, depth=2)
+    table.store(key, 0.5, depth=1)
+    entry = table.lookup(key)
+    assert (entry.value, entry.depth, entry.visits) == (1.5, 2, 2)
+    table.store(key, 3.0, depth=3)
+    assert table.lookup(key).value == 3.0
+
+    go.play((1, 1))
+    assert table.lookup(table.key(go)) is None
+    assert (table.hits, table.misses) == (2, 2)
+    assert table.hit_rate == 0.5
+    assert "50.0% hit rate" in table.summary()
+
+    # the same board and player to move, but one pass from the end
+    passed = Go(5, 3)
+    passed.apply_move((1, 1))
+    passed.pass_turn()
+    passed.pass_turn()
+    loaded = Go(5, 3)
+    loaded.load_game(1, passed.grid)
+    assert table.key(passed)[:2] == table.key(loaded)[:2]
+    assert table.key(passed) != table.key(loaded)
+
+    with pytest.raises(ValueError):
+        TranspositionTable(ENTRY_BYTES - 1)
+    with pytest.raises(ValueError):
+        TranspositionTable(policy="fifo")
+
+
+@pytest.mark.parametrize("policy", ["lru", "depth"])
+def test_table_eviction(policy: str) -> None:
+    """
+    Check that a full table stays within its capacity, evicting the least
+    recently used entry, or under the depth policy the shallowest of the
+    least recently used ones.
+    """
+    table = TranspositionTable(4 * (ENTRY_BYTES + value_bytes("a")), policy)
+    table.store((1, 1), "a", depth=5)
+    table.store((2, 1), "b", depth=0)
+    table.store((3, 1), "c", depth=1)
+    table.store((4, 1), "d", depth=2)
+    table.lookup((3, 1))
+    table.store((5, 1), "e")
+    assert len(table) == 4
+    assert table.evictions == 1
+    if policy == "lru":
+        assert table.lookup((1, 1)) is None
+        assert table.lookup((2, 1)) is not None
+    else:
+        assert table.lookup((1, 1)) is not None
+        assert table.lookup((2, 1)) is None
+
+
+def test_smart_strategy_uses_table() -> None:
+    """
+    Check that the smart strategy chooses the same move with a table, and
+    that scanning the same position again only hits the table.
+    """
+    go = Go(4, 2)
+    for move in [(2, 2), (3, 3)]:
+        go.apply_move(move)
+    table = TranspositionTable()
+    assert smart_strategy(go, table) == smart_strategy(go)
+    misses = table.misses
+    assert smart_strategy(go, table) == smart_strategy(go)
+    assert table.misses == misses
+    assert table.hits >= misses
+
+
+@pytest.mark.parametrize("kind", ["scores", "bounds"])
+def test_table_memory_within_cap(kind: str) -> None:
+    """
+    Check that a table filled past its memory cap, with values like those
+    of the smart strategy (scores) or of the minimax strategy (bounds),
+    uses no more memory than the cap.
+    """
+    rng = random.Random(0)
+    max_bytes = 256 * 1024
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        table = TranspositionTable(max_bytes)
+        for _ in range(5000):
+            key = (rng.getrandbits(64), rng.randint(1, 2), 0)
+            if kind == "scores":
+                value = {1: rng.randrange(1000), 2: rng.randrange(1000)}
+            else:
+                value = (rng.random(), rng.randrange(3),
+                         (rng.randint(1, 19), rng.randint(1, 19)))
+            table.store(key, value)
+        used = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    assert table.evictions > 0
+    assert table.size <= max_bytes
+    assert used <= max_bytes